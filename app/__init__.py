@@ -1,10 +1,12 @@
 """
 Expense Tracker - Main Application Factory
 Flask app initialization with extensions and blueprints.
-Follows MVC architecture for maintainability.
+Follows MVC architecture for maintainability. Importing the package does
+not build an app: entry points call get_app(), which creates one per process.
 """
 
 import os
+import time
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
@@ -13,31 +15,46 @@ from flask_login import LoginManager
 db = SQLAlchemy()
 login_manager = LoginManager()
 
-def create_app(config_name='default'):
+def create_app(config_name='default', overrides=None):
     """
     Application factory pattern - creates and configures the Flask app.
-    This allows for different configurations (dev, prod, test).
+    This allows for different configurations (dev, prod, test); `overrides`
+    replaces individual settings, e.g. the database URI for benchmarks.
     """
+    started = time.perf_counter()
     app = Flask(__name__)
     
     # Load configuration
     from config import config
     app.config.from_object(config[config_name])
+    if overrides:
+        app.config.update(overrides)
     
-    # Initialize extensions with app
+    # Initialize extensions with app; pool options and SQLite PRAGMAs come from config
+    from app import database
+    database.configure_engine(app)
     db.init_app(app)
+    database.register_pragmas(app)
     login_manager.init_app(app)
     
+    from app.services import cache
+    cache.init_app(app)
+    
+    # Per-request SQL counts, Server-Timing headers and slow/N+1 query logs
+    from app import instrumentation
+    instrumentation.init_app(app)
+    
     # Configure Flask-Login
     login_manager.login_view = 'auth.login'
     login_manager.login_message = 'Please log in to access this page.'
     login_manager.login_message_category = 'info'
     
     # User loader - required by Flask-Login to load user from session
-    from app.models.user import User
+    # (served from the reference-data cache, so most requests skip the query)
     @login_manager.user_loader
     def load_user(user_id):
-        return User.query.get(int(user_id))
+        from app.services.refdata import get_user
+        return get_user(int(user_id))
     
     # Register blueprints for modular routing
     from app.routes.auth import auth_bp
@@ -47,6 +64,8 @@ def create_app(config_name='default'):
     from app.routes.categories import categories_bp
     from app.routes.budgets import budgets_bp
     from app.routes.reports import reports_bp
+    from app.routes.recurring import recurring_bp
+    from app.routes.api import api_bp
     
     app.register_blueprint(auth_bp, url_prefix='/auth')
     app.register_blueprint(main_bp)
@@ -55,15 +74,43 @@ def create_app(config_name='default'):
     app.register_blueprint(categories_bp, url_prefix='/categories')
     app.register_blueprint(budgets_bp, url_prefix='/budgets')
     app.register_blueprint(reports_bp, url_prefix='/reports')
+    app.register_blueprint(recurring_bp, url_prefix='/recurring')
+    app.register_blueprint(api_bp, url_prefix='/api')
+    
+    # Maintenance commands (flask rollups ...)
+    from app.cli import register_commands
+    register_commands(app)
     
-    # Create database tables within app context
-    # Import models to register them with SQLAlchemy before create_all()
+    # Create database tables and apply pending migrations within app context
+    # Import models to register them with SQLAlchemy before create_all();
+    # a database already at the current schema version skips both
     with app.app_context():
         from app import models  # noqa: F401
-        db.create_all()
+        from app.migrations import upgrade_schema
+        upgrade_schema()
+        # Pooled connections must not be shared with workers forked by gunicorn --preload
+        if not database.is_memory_sqlite(app.config['SQLALCHEMY_DATABASE_URI']):
+            db.engine.dispose()
     
+    app.config['BOOT_SECONDS'] = time.perf_counter() - started
+    app.logger.debug('App created in %.1f ms', app.config['BOOT_SECONDS'] * 1000)
     return app
 
+# Apps already created in this process, by config name
+_apps = {}
+
+def get_app(config_name=None):
+    """
+    Return this process's app for config_name (default: FLASK_ENV, else
+    'production'), creating it on first use so entry points share one app.
+    """
+    config_name = config_name or os.getenv('FLASK_ENV', 'production')
+    if config_name not in _apps:
+        _apps[config_name] = create_app(config_name)
+    return _apps[config_name]
 
-# App instance for Gunicorn: gunicorn app:app
-app = create_app(os.getenv('FLASK_ENV', 'production'))
+def __getattr__(name):
+    # `gunicorn app:app` still works, but the app is only built when asked for
+    if name == 'app':
+        return get_app()
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
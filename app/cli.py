@@ -0,0 +1,183 @@
+"""
+Command line tools - Maintenance commands registered on the Flask CLI.
+Usage: flask --app wsgi rollups rebuild
+"""
+
+import click
+from flask.cli import AppGroup
+
+rollups_cli = AppGroup('rollups', help='Maintain the monthly rollup tables.')
+
+@rollups_cli.command('rebuild')
+@click.option('--user-id', 'user_ids', type=int, multiple=True, help='Only rebuild these users.')
+@click.option('--batch-size', default=500, show_default=True, help='Users per transaction.')
+def rebuild_rollups_command(user_ids, batch_size):
+    """Recompute rollups from the expense and income tables."""
+    from app.services.rollups import rebuild_rollups
+    count = rebuild_rollups(user_ids or None, batch_size=batch_size)
+    click.echo(f'Rebuilt rollups for {count} user(s).')
+
+@rollups_cli.command('verify')
+@click.option('--user-id', 'user_ids', type=int, multiple=True, help='Only verify these users.')
+@click.option('--batch-size', default=500, show_default=True, help='Users per batch.')
+def verify_rollups_command(user_ids, batch_size):
+    """Check rollups against the expense and income tables."""
+    from app.services.rollups import verify_rollups
+    mismatches = verify_rollups(user_ids or None, batch_size=batch_size)
+    for table, key, expected, actual in mismatches:
+        click.echo(f'{table} {key}: expected {expected}, found {actual}')
+    if mismatches:
+        raise click.ClickException(f'{len(mismatches)} rollup row(s) out of date. Run: flask rollups rebuild')
+    click.echo('Rollups are up to date.')
+
+reports_cli = AppGroup('reports', help='Manage cached report files.')
+
+@reports_cli.command('evict')
+def evict_reports_command():
+    """Delete report artifacts past the configured age or size limits."""
+    import os
+    from flask import current_app
+    from app.services.reports import evict_artifacts
+    if not os.path.isdir(current_app.config['REPORT_ARTIFACT_DIR']):
+        click.echo('No report artifacts.')
+        return
+    click.echo(f'Removed {evict_artifacts(current_app.config)} report file(s).')
+
+import_cli = AppGroup('import-csv', help='Bulk import expenses or income from CSV files.')
+
+def _get_user_id(email):
+    """Look up a user id by email or stop with an error."""
+    from app.models.user import User
+    user = User.query.filter_by(email=email.strip().lower()).first()
+    if user is None:
+        raise click.ClickException(f'No user with email {email}')
+    return user.user_id
+
+def _check_encoding(ctx, param, value):
+    """Reject encodings Python does not know before any rows are read."""
+    import codecs
+    try:
+        codecs.lookup(value)
+    except LookupError:
+        raise click.BadParameter(f'unknown encoding {value}')
+    return value
+
+def _report_import(result, noun):
+    """Print the import summary; a file that could not be read to the end exits non-zero."""
+    from app.services.importer import import_summary
+    click.echo(import_summary(result, noun))
+    for error in result['errors']:
+        click.echo(f'  {error}')
+    if result['failed'] > len(result['errors']):
+        click.echo(f"  ... {result['failed'] - len(result['errors'])} more rows failed")
+    if result['stopped']:
+        raise click.ClickException('Import stopped before the end of the file; rows before that point were kept.')
+
+@import_cli.command('expenses')
+@click.argument('path', type=click.File('rb'))
+@click.option('--email', required=True, help='Owner of the imported rows.')
+@click.option('--batch-size', default=5000, show_default=True, help='Rows per transaction.')
+@click.option('--encoding', default='utf-8-sig', show_default=True, callback=_check_encoding,
+              help='Text encoding of the file, e.g. cp1252 for Excel or bank exports.')
+def import_expenses_command(path, email, batch_size, encoding):
+    """Import expenses (date, amount, category, description) from PATH."""
+    from app.services.importer import import_expenses_csv
+    _report_import(import_expenses_csv(_get_user_id(email), path, batch_size, encoding), 'expenses')
+
+@import_cli.command('income')
+@click.argument('path', type=click.File('rb'))
+@click.option('--email', required=True, help='Owner of the imported rows.')
+@click.option('--batch-size', default=5000, show_default=True, help='Rows per transaction.')
+@click.option('--encoding', default='utf-8-sig', show_default=True, callback=_check_encoding,
+              help='Text encoding of the file, e.g. cp1252 for Excel or bank exports.')
+def import_income_command(path, email, batch_size, encoding):
+    """Import income (date, amount, source) from PATH."""
+    from app.services.importer import import_income_csv
+    _report_import(import_income_csv(_get_user_id(email), path, batch_size, encoding), 'income records')
+
+database_cli = AppGroup('database', help='SQLite maintenance.')
+
+@database_cli.command('maintain')
+@click.option('--every', type=float, help='Repeat every N seconds instead of running once.')
+@click.option('--analyze/--no-analyze', default=True, show_default=True, help='Run a full ANALYZE.')
+@click.option('--checkpoint', default='TRUNCATE', show_default=True,
+              type=click.Choice(['PASSIVE', 'FULL', 'RESTART', 'TRUNCATE'], case_sensitive=False),
+              help='WAL checkpoint mode.')
+@click.option('--vacuum-pages', type=int, help='Free at most this many pages per run (default: all).')
+def maintain_command(every, analyze, checkpoint, vacuum_pages):
+    """Run ANALYZE, PRAGMA optimize, incremental vacuum and a WAL checkpoint."""
+    import time
+    from app import db
+    from app.database import run_maintenance
+    while True:
+        result = run_maintenance(db.engine, analyze, checkpoint.upper(), vacuum_pages)
+        ckpt = result['checkpoint']
+        freed = 'incremental vacuum off' if result['freed_pages'] is None else f"freed {result['freed_pages']} page(s)"
+        click.echo(f"{time.strftime('%Y-%m-%d %H:%M:%S')} analyze {result.get('analyze_seconds', '-')}s, "
+                   f"{freed}, {result['free_pages']} free, checkpoint {ckpt['checkpointed']}/{ckpt['wal_frames']} frames"
+                   + (' (busy)' if ckpt['busy'] else ''))
+        if not every:
+            break
+        time.sleep(every)
+
+@database_cli.command('enable-incremental-vacuum')
+def enable_incremental_vacuum_command():
+    """Convert the database to auto_vacuum=INCREMENTAL (runs a full VACUUM)."""
+    from app import db
+    from app.database import enable_incremental_vacuum
+    if not enable_incremental_vacuum(db.engine):
+        raise click.ClickException('auto_vacuum could not be changed.')
+    click.echo('Incremental vacuum enabled.')
+
+recurring_cli = AppGroup('recurring', help='Generate entries from recurring rules.')
+
+@recurring_cli.command('run')
+@click.option('--until', type=click.DateTime(formats=['%Y-%m-%d']), help='Last date to generate (default: today).')
+@click.option('--user-id', 'user_ids', type=int, multiple=True, help='Only these users.')
+@click.option('--batch-size', type=int, help='Rules per transaction (default: RECURRING_BATCH_SIZE).')
+def run_recurring_command(until, user_ids, batch_size):
+    """Create every due expense and income occurrence; safe to re-run."""
+    from app.services.recurring import materialize_due
+    result = materialize_due(until.date() if until else None, user_ids or None, batch_size)
+    click.echo(f"Created {result['expenses']} expense(s) and {result['income']} income record(s) "
+               f"from {result['rules']} due rule(s).")
+
+categories_cli = AppGroup('categories', help='Reorganise expense categories.')
+
+@categories_cli.command('merge')
+@click.argument('sources', nargs=-1, required=True)
+@click.option('--into', 'target', required=True, help='Category that receives the expenses.')
+@click.option('--email', required=True, help='Owner of the categories.')
+@click.option('--batch-size', type=int, help='Expenses per transaction (default: CATEGORY_MOVE_BATCH_SIZE).')
+def merge_categories_command(sources, target, email, batch_size):
+    """Move all expenses of the SOURCES categories into --into and delete SOURCES."""
+    from app.services import refdata
+    from app.services.categories import merge_categories
+    user_id = _get_user_id(email)
+    ids = {c.category_name.lower(): c.category_id for c in refdata.get_categories(user_id)}
+    missing = [name for name in (target, *sources) if name.lower() not in ids]
+    if missing:
+        raise click.ClickException(f"No category named {', '.join(missing)}")
+    moved = merge_categories(user_id, [ids[name.lower()] for name in sources], ids[target.lower()], batch_size)
+    click.echo(f'Moved {moved} expense(s) into {target}.')
+
+search_cli = AppGroup('search', help='Maintain the expense full-text search index.')
+
+@search_cli.command('rebuild')
+def rebuild_search_command():
+    """Re-index every expense description and category name."""
+    from app.services.search import rebuild_search_index
+    count = rebuild_search_index()
+    if count is None:
+        raise click.ClickException('Full-text search needs SQLite with FTS5; searches use LIKE instead.')
+    click.echo(f'Indexed {count} expense(s).')
+
+def register_commands(app):
+    """Attach CLI command groups to the app."""
+    app.cli.add_command(rollups_cli)
+    app.cli.add_command(reports_cli)
+    app.cli.add_command(import_cli)
+    app.cli.add_command(database_cli)
+    app.cli.add_command(recurring_cli)
+    app.cli.add_command(categories_cli)
+    app.cli.add_command(search_cli)
@@ -0,0 +1,102 @@
+"""
+Database engine setup - Pool options, SQLite PRAGMAs and maintenance.
+Every new SQLite connection gets the PRAGMAs from SQLITE_PRAGMAS (WAL
+journal, synchronous level, busy timeout, page cache, mmap, temp store),
+so readers and writers in different workers stop blocking each other.
+run_maintenance() refreshes planner statistics and reclaims WAL and free
+pages; `flask database maintain` runs it once or on a schedule.
+"""
+
+import time
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from app import db
+
+CHECKPOINT_MODES = ('PASSIVE', 'FULL', 'RESTART', 'TRUNCATE')
+
+def is_sqlite(uri):
+    return make_url(uri).get_backend_name() == 'sqlite'
+
+def is_memory_sqlite(uri):
+    url = make_url(uri)
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+def engine_options(config):
+    """
+    SQLALCHEMY_ENGINE_OPTIONS built from the DB_POOL_* settings.
+    In-memory SQLite uses a single static connection, so it gets none.
+    """
+    options = dict(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    if is_memory_sqlite(config['SQLALCHEMY_DATABASE_URI']):
+        return options
+    options.setdefault('pool_size', config['DB_POOL_SIZE'])
+    options.setdefault('max_overflow', config['DB_MAX_OVERFLOW'])
+    options.setdefault('pool_timeout', config['DB_POOL_TIMEOUT'])
+    options.setdefault('pool_recycle', config['DB_POOL_RECYCLE'])
+    return options
+
+def configure_engine(app):
+    """Set engine options before db.init_app(app) creates the engine."""
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config)
+
+def register_pragmas(app):
+    """Apply SQLITE_PRAGMAS on every new connection of the app's SQLite engine."""
+    pragmas = app.config.get('SQLITE_PRAGMAS')
+    if not pragmas or not is_sqlite(app.config['SQLALCHEMY_DATABASE_URI']):
+        return
+    statements = [f'PRAGMA {name} = {value}' for name, value in pragmas.items()]
+    
+    with app.app_context():
+        engine = db.engine
+    
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for statement in statements:
+            cursor.execute(statement)
+        cursor.close()
+
+def run_maintenance(engine, analyze=True, checkpoint='TRUNCATE', vacuum_pages=None):
+    """
+    Run SQLite housekeeping and return what was done as a dict:
+    WAL checkpoint, ANALYZE (full statistics refresh), PRAGMA optimize and,
+    when auto_vacuum is INCREMENTAL, incremental_vacuum of free pages
+    (all of them unless vacuum_pages limits it).
+    """
+    if checkpoint not in CHECKPOINT_MODES:
+        raise ValueError(f'checkpoint must be one of {", ".join(CHECKPOINT_MODES)}')
+    
+    result = {}
+    with engine.connect() as conn:
+        if analyze:
+            started = time.perf_counter()
+            conn.exec_driver_sql('ANALYZE')
+            result['analyze_seconds'] = round(time.perf_counter() - started, 3)
+        conn.exec_driver_sql('PRAGMA optimize')
+        conn.commit()
+        
+        free_before = conn.exec_driver_sql('PRAGMA freelist_count').scalar()
+        if conn.exec_driver_sql('PRAGMA auto_vacuum').scalar() == 2:
+            pages = '' if vacuum_pages is None else f'({int(vacuum_pages)})'
+            # incremental_vacuum frees one page per step; executescript steps it to completion
+            conn.connection.driver_connection.executescript(f'PRAGMA incremental_vacuum{pages};')
+            result['freed_pages'] = free_before - conn.exec_driver_sql('PRAGMA freelist_count').scalar()
+        else:
+            result['freed_pages'] = None
+        result['free_pages'] = conn.exec_driver_sql('PRAGMA freelist_count').scalar()
+        
+        # The checkpoint runs last so it also covers the pages written above
+        busy, log_frames, checkpointed = conn.execute(text(f'PRAGMA wal_checkpoint({checkpoint})')).one()
+        result['checkpoint'] = {'busy': bool(busy), 'wal_frames': log_frames, 'checkpointed': checkpointed}
+        conn.commit()
+    return result
+
+def enable_incremental_vacuum(engine):
+    """
+    Switch an existing database to auto_vacuum=INCREMENTAL. The setting only
+    takes effect after a full VACUUM, which rewrites the whole file.
+    """
+    with engine.connect() as conn:
+        conn.exec_driver_sql('PRAGMA auto_vacuum = INCREMENTAL')
+        conn.exec_driver_sql('VACUUM')
+        return conn.exec_driver_sql('PRAGMA auto_vacuum').scalar() == 2
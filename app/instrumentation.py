@@ -0,0 +1,84 @@
+"""
+SQL instrumentation - Per-request query counts and timings.
+When SQL_INSTRUMENTATION is on, engine events time every statement; each
+response gets a Server-Timing header, slow statements are logged with the
+endpoint that ran them, and statements repeated within one request are
+reported as N+1 suspects. When it is off nothing is registered at all.
+"""
+
+import logging
+import time
+from collections import Counter
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from app import db
+
+logger = logging.getLogger(__name__)
+
+class RequestStats:
+    """SQL activity of one request."""
+    
+    __slots__ = ('started', 'count', 'seconds', 'shapes')
+    
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes = Counter()
+
+def _statement_shape(statement):
+    """Collapse whitespace so the same statement always counts as one shape."""
+    return ' '.join(statement.split())
+
+def _request_stats():
+    if has_request_context():
+        return g.get('sql_stats')
+    return None
+
+def init_app(app):
+    """Register the engine events and request hooks if instrumentation is enabled."""
+    if not app.config.get('SQL_INSTRUMENTATION'):
+        return
+    
+    slow_seconds = app.config['SQL_SLOW_QUERY_MS'] / 1000
+    repeat_threshold = app.config['SQL_N_PLUS_ONE_THRESHOLD']
+    
+    with app.app_context():
+        engine = db.engine
+    
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_started', []).append(time.perf_counter())
+    
+    @event.listens_for(engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['query_started'].pop()
+        stats = _request_stats()
+        if stats is None:
+            return
+        stats.count += 1
+        stats.seconds += elapsed
+        stats.shapes[_statement_shape(statement)] += 1
+        if elapsed >= slow_seconds:
+            logger.warning('Slow SQL (%.1f ms) in %s: %s',
+                           elapsed * 1000, request.endpoint, _statement_shape(statement)[:500])
+    
+    @app.before_request
+    def start_request_stats():
+        g.sql_stats = RequestStats()
+    
+    @app.after_request
+    def add_server_timing(response):
+        stats = _request_stats()
+        if stats is None:
+            return response
+        total_ms = (time.perf_counter() - stats.started) * 1000
+        response.headers.add(
+            'Server-Timing',
+            f'sql;dur={stats.seconds * 1000:.2f};desc="{stats.count} queries", app;dur={total_ms:.2f}'
+        )
+        for shape, repeats in stats.shapes.items():
+            if repeats >= repeat_threshold:
+                logger.warning('Possible N+1 in %s: statement ran %d times: %s',
+                               request.endpoint, repeats, shape[:500])
+        return response
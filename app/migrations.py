@@ -0,0 +1,150 @@
+"""
+Schema migrations - Upgrades for databases created by older versions.
+db.create_all() only adds missing tables, so changes to existing tables
+(new indexes, columns, backfills) are applied here in version order.
+"""
+
+from sqlalchemy import inspect, select, text
+from app import db
+
+# Single-row table holding the version of the last applied migration
+schema_version = db.Table(
+    'schema_version',
+    db.Column('version', db.Integer, nullable=False)
+)
+
+def create_missing_indexes(conn):
+    """
+    Create model-declared indexes that existing tables do not have yet.
+    Indexes on columns a later migration adds are left for that migration.
+    """
+    inspector = inspect(conn)
+    for table in db.metadata.sorted_tables:
+        existing = {c['name'] for c in inspector.get_columns(table.name)}
+        for index in table.indexes:
+            if {c.name for c in index.columns} <= existing:
+                index.create(conn, checkfirst=True)
+
+def add_column(conn, table_name, column_name):
+    """Add a model-declared column to an existing table if it is missing."""
+    existing = {c['name'] for c in inspect(conn).get_columns(table_name)}
+    if column_name in existing:
+        return
+    column = db.metadata.tables[table_name].c[column_name]
+    column_type = column.type.compile(dialect=conn.dialect)
+    ddl = f'ALTER TABLE {table_name} ADD COLUMN {column_name} {column_type}'
+    if column.server_default is not None:
+        ddl += f" DEFAULT {column.server_default.arg}"
+    if not column.nullable:
+        ddl += ' NOT NULL'
+    conn.execute(text(ddl))
+
+def backfill_rollups(conn):
+    """Populate the monthly rollup tables from existing expenses and income."""
+    # Older databases still store float amounts; the paise conversion rebuilds them later
+    if 'amount_minor' not in {c['name'] for c in inspect(conn).get_columns('expenses')}:
+        return
+    from app.services.rollups import rebuild_rollups
+    rebuild_rollups(conn=conn)
+
+def add_data_version(conn):
+    """Add users.data_version used to key the per-user result cache."""
+    add_column(conn, 'users', 'data_version')
+
+def add_import_fingerprints(conn):
+    """Add the CSV import fingerprint columns and their indexes."""
+    add_column(conn, 'expenses', 'import_fingerprint')
+    add_column(conn, 'income', 'import_fingerprint')
+    create_missing_indexes(conn)
+
+def _replace_money_column(conn, table_name, float_column, minor_column):
+    """Replace a float rupee column with an integer paise column, converting the values."""
+    existing = {c['name'] for c in inspect(conn).get_columns(table_name)}
+    if minor_column not in existing:
+        conn.execute(text(
+            f'ALTER TABLE {table_name} ADD COLUMN {minor_column} INTEGER NOT NULL DEFAULT 0'
+        ))
+    if float_column in existing:
+        conn.execute(text(f'UPDATE {table_name} SET {minor_column} = ROUND({float_column} * 100)'))
+        conn.execute(text(f'ALTER TABLE {table_name} DROP COLUMN {float_column}'))
+
+def convert_amounts_to_minor_units(conn):
+    """
+    Store money as integer paise instead of float rupees. Rollups are
+    recomputed from the converted rows, dropping any accumulated float drift.
+    """
+    for table_name in ('expenses', 'income', 'budgets'):
+        _replace_money_column(conn, table_name, 'amount', 'amount_minor')
+    for table_name in ('expense_rollups', 'income_rollups'):
+        _replace_money_column(conn, table_name, 'total', 'total_minor')
+    backfill_rollups(conn)
+
+def add_expense_search(conn):
+    """Create the FTS5 expense search table and triggers, then index existing expenses."""
+    from app.services.search import create_search_index, rebuild_search_index
+    if create_search_index(conn):
+        rebuild_search_index(conn)
+
+def add_recurring_rules(conn):
+    """Link expenses and income to the recurring rule that generated them."""
+    add_column(conn, 'expenses', 'recurring_rule_id')
+    add_column(conn, 'income', 'recurring_rule_id')
+    create_missing_indexes(conn)
+
+# Ordered (version, upgrade function) pairs - append new migrations at the end
+MIGRATIONS = [
+    (1, create_missing_indexes),
+    (2, backfill_rollups),
+    (3, add_data_version),
+    (4, add_import_fingerprints),
+    (5, convert_amounts_to_minor_units),
+    (6, add_expense_search),
+    (7, create_missing_indexes),
+    (8, add_recurring_rules),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+def get_schema_version(conn):
+    """Return the stored schema version (0 for databases that predate it)."""
+    if not inspect(conn).has_table('schema_version'):
+        return 0
+    return conn.execute(select(schema_version.c.version)).scalar() or 0
+
+def set_schema_version(conn, version):
+    """Store the schema version, replacing any previous row."""
+    conn.execute(schema_version.delete())
+    conn.execute(schema_version.insert().values(version=version))
+
+def schema_is_current():
+    """True when the database is already stamped with SCHEMA_VERSION."""
+    with db.engine.connect() as conn:
+        return get_schema_version(conn) == SCHEMA_VERSION
+
+def upgrade_schema():
+    """
+    Create missing tables and apply pending migrations in one transaction.
+    A brand new database already gets the latest schema from create_all(),
+    so its migrations are skipped and it is stamped with SCHEMA_VERSION.
+    Returns False without taking the write lock when the stored version is
+    current, so worker boots cost one read; schema changes therefore always
+    come with a new migration (create_all runs again whenever one is pending).
+    """
+    if schema_is_current():
+        return False
+    
+    with db.engine.begin() as conn:
+        if conn.dialect.name == 'sqlite':
+            # Take the write lock first so workers starting together run this one at a time
+            conn.exec_driver_sql('BEGIN IMMEDIATE')
+        is_new = not inspect(conn).has_table('users')
+        current = SCHEMA_VERSION if is_new else get_schema_version(conn)
+        db.metadata.create_all(conn)
+        
+        for version, upgrade in MIGRATIONS:
+            if version > current:
+                upgrade(conn)
+        
+        if current != SCHEMA_VERSION or is_new:
+            set_schema_version(conn, SCHEMA_VERSION)
+    return True
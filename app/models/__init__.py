@@ -8,5 +8,7 @@ from app.models.category import Category
 from app.models.expense import Expense
 from app.models.income import Income
 from app.models.budget import Budget
+from app.models.rollup import ExpenseRollup, IncomeRollup
+from app.models.recurring import RecurringRule
 
-__all__ = ['User', 'Category', 'Expense', 'Income', 'Budget']
+__all__ = ['User', 'Category', 'Expense', 'Income', 'Budget', 'ExpenseRollup', 'IncomeRollup', 'RecurringRule']
@@ -4,6 +4,7 @@ Used for overspending alerts and financial insights.
 """
 
 from app import db
+from app.utils.money import from_minor, to_minor
 
 class Budget(db.Model):
     """
@@ -17,12 +18,21 @@ class Budget(db.Model):
     
     month = db.Column(db.Integer, nullable=False)  # 1-12
     year = db.Column(db.Integer, nullable=False)
-    amount = db.Column(db.Float, nullable=False)
+    amount_minor = db.Column(db.Integer, nullable=False)  # paise
     
     # Ensure one budget per user per month
     __table_args__ = (
         db.UniqueConstraint('user_id', 'month', 'year', name='unique_user_budget'),
     )
     
+    @property
+    def amount(self):
+        """Amount in rupees (stored as integer paise in amount_minor)."""
+        return from_minor(self.amount_minor)
+    
+    @amount.setter
+    def amount(self, value):
+        self.amount_minor = to_minor(value)
+    
     def __repr__(self):
         return f'<Budget {self.month}/{self.year}: {self.amount}>'
@@ -4,7 +4,9 @@ Links to user and category for proper data isolation and reporting.
 """
 
 from datetime import datetime
+from sqlalchemy import event
 from app import db
+from app.utils.money import from_minor, to_minor
 
 class Expense(db.Model):
     """
@@ -18,9 +20,40 @@ class Expense(db.Model):
     category_id = db.Column(db.Integer, db.ForeignKey('categories.category_id', ondelete='CASCADE'), nullable=False)
     
     # Transaction details
-    amount = db.Column(db.Float, nullable=False)
+    amount_minor = db.Column(db.Integer, nullable=False)  # paise
     expense_date = db.Column(db.Date, nullable=False)
     description = db.Column(db.String(200), default='')
     
+    # Content hash set by CSV import so re-imported rows can be skipped
+    import_fingerprint = db.Column(db.String(40), nullable=True)
+    
+    # Recurring rule that generated this row (unique per occurrence date)
+    recurring_rule_id = db.Column(db.Integer, db.ForeignKey('recurring_rules.rule_id', ondelete='SET NULL'), nullable=True)
+    
+    # Composite indexes for per-user date range and category filters
+    __table_args__ = (
+        db.Index('ix_expenses_user_date', 'user_id', 'expense_date'),
+        db.Index('ix_expenses_user_category_date', 'user_id', 'category_id', 'expense_date'),
+        db.Index('ix_expenses_user_fingerprint', 'user_id', 'import_fingerprint'),
+        db.Index('ix_expenses_recurring_occurrence', 'recurring_rule_id', 'expense_date', unique=True),
+        # Foreign key lookups from categories (cascading deletes, category-wide updates)
+        db.Index('ix_expenses_category', 'category_id'),
+    )
+    
+    @property
+    def amount(self):
+        """Amount in rupees (stored as integer paise in amount_minor)."""
+        return from_minor(self.amount_minor)
+    
+    @amount.setter
+    def amount(self, value):
+        self.amount_minor = to_minor(value)
+    
     def __repr__(self):
         return f'<Expense {self.amount} - {self.expense_date}>'
+
+@event.listens_for(Expense.__table__, 'after_create')
+def add_search_index(target, connection, **kw):
+    # New databases get the full-text search table with the expenses table
+    from app.services.search import create_search_index
+    create_search_index(connection)
@@ -4,6 +4,7 @@ Used for calculating savings and financial insights.
 """
 
 from app import db
+from app.utils.money import from_minor, to_minor
 
 class Income(db.Model):
     """
@@ -15,9 +16,31 @@ class Income(db.Model):
     income_id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.user_id', ondelete='CASCADE'), nullable=False)
     
-    amount = db.Column(db.Float, nullable=False)
+    amount_minor = db.Column(db.Integer, nullable=False)  # paise
     income_date = db.Column(db.Date, nullable=False)
     source = db.Column(db.String(100), default='Salary')
     
+    # Content hash set by CSV import so re-imported rows can be skipped
+    import_fingerprint = db.Column(db.String(40), nullable=True)
+    
+    # Recurring rule that generated this row (unique per occurrence date)
+    recurring_rule_id = db.Column(db.Integer, db.ForeignKey('recurring_rules.rule_id', ondelete='SET NULL'), nullable=True)
+    
+    # Composite indexes for per-user date range filters and import de-duplication
+    __table_args__ = (
+        db.Index('ix_income_user_date', 'user_id', 'income_date'),
+        db.Index('ix_income_user_fingerprint', 'user_id', 'import_fingerprint'),
+        db.Index('ix_income_recurring_occurrence', 'recurring_rule_id', 'income_date', unique=True),
+    )
+    
+    @property
+    def amount(self):
+        """Amount in rupees (stored as integer paise in amount_minor)."""
+        return from_minor(self.amount_minor)
+    
+    @amount.setter
+    def amount(self, value):
+        self.amount_minor = to_minor(value)
+    
     def __repr__(self):
         return f'<Income {self.amount} from {self.source}>'
@@ -0,0 +1,55 @@
+"""
+Recurring rule model - Repeating expenses and income (rent, salary, subscriptions).
+Occurrences are materialized as ordinary Expense/Income rows by the
+recurring service; next_date is the first occurrence not generated yet.
+"""
+
+from datetime import datetime
+from app import db
+from app.utils.money import from_minor, to_minor
+
+# Supported frequencies; interval multiplies them (every 2 weeks, every 3 months)
+FREQUENCIES = ('daily', 'weekly', 'monthly', 'yearly')
+MAX_INTERVAL = 366
+
+class RecurringRule(db.Model):
+    """
+    Recurring rule table - one repeating expense (with a category) or income
+    (with a source) per row, from start_date until end_date (inclusive, optional).
+    """
+    __tablename__ = 'recurring_rules'
+    
+    rule_id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.user_id', ondelete='CASCADE'), nullable=False)
+    kind = db.Column(db.String(10), nullable=False)  # 'expense' or 'income'
+    category_id = db.Column(db.Integer, db.ForeignKey('categories.category_id', ondelete='CASCADE'), nullable=True)
+    source = db.Column(db.String(100), nullable=True)
+    description = db.Column(db.String(200), default='')
+    amount_minor = db.Column(db.Integer, nullable=False)  # paise
+    
+    # Schedule: every `interval` days/weeks/months/years from start_date
+    frequency = db.Column(db.String(10), nullable=False)
+    interval = db.Column(db.Integer, nullable=False, default=1)
+    start_date = db.Column(db.Date, nullable=False)
+    end_date = db.Column(db.Date, nullable=True)
+    next_date = db.Column(db.Date, nullable=True)  # None once the rule has ended
+    
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Due rules are found by next occurrence date, across all users or for one
+    __table_args__ = (
+        db.Index('ix_recurring_rules_next_date', 'next_date'),
+        db.Index('ix_recurring_rules_user_next_date', 'user_id', 'next_date'),
+    )
+    
+    @property
+    def amount(self):
+        """Amount in rupees (stored as integer paise in amount_minor)."""
+        return from_minor(self.amount_minor)
+    
+    @amount.setter
+    def amount(self, value):
+        self.amount_minor = to_minor(value)
+    
+    def __repr__(self):
+        return f'<RecurringRule {self.kind} {self.amount} {self.frequency}>'
@@ -0,0 +1,52 @@
+"""
+Rollup models - Monthly income and expense totals per user.
+Kept in step with every write so aggregate pages read a handful of
+small rows instead of summing the raw transaction tables.
+"""
+
+from app import db
+from app.utils.money import from_minor
+
+class ExpenseRollup(db.Model):
+    """
+    Expense rollup table - sum and count of expenses per user, month and category.
+    Maintained by app.services.rollups in the same transaction as the expense write.
+    """
+    __tablename__ = 'expense_rollups'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.user_id', ondelete='CASCADE'), primary_key=True)
+    year = db.Column(db.Integer, primary_key=True)
+    month = db.Column(db.Integer, primary_key=True)  # 1-12
+    category_id = db.Column(db.Integer, db.ForeignKey('categories.category_id', ondelete='CASCADE'), primary_key=True)
+    
+    total_minor = db.Column(db.Integer, nullable=False, default=0)  # paise
+    count = db.Column(db.Integer, nullable=False, default=0)
+    
+    @property
+    def total(self):
+        """Total in rupees."""
+        return from_minor(self.total_minor)
+    
+    def __repr__(self):
+        return f'<ExpenseRollup {self.month}/{self.year} cat={self.category_id}: {self.total}>'
+
+class IncomeRollup(db.Model):
+    """
+    Income rollup table - sum and count of income entries per user and month.
+    """
+    __tablename__ = 'income_rollups'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.user_id', ondelete='CASCADE'), primary_key=True)
+    year = db.Column(db.Integer, primary_key=True)
+    month = db.Column(db.Integer, primary_key=True)  # 1-12
+    
+    total_minor = db.Column(db.Integer, nullable=False, default=0)  # paise
+    count = db.Column(db.Integer, nullable=False, default=0)
+    
+    @property
+    def total(self):
+        """Total in rupees."""
+        return from_minor(self.total_minor)
+    
+    def __repr__(self):
+        return f'<IncomeRollup {self.month}/{self.year}: {self.total}>'
@@ -5,7 +5,6 @@ Implements Flask-Login's UserMixin for session management.
 
 from datetime import datetime
 from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
 from app import db
 
 class User(UserMixin, db.Model):
@@ -26,6 +25,9 @@ class User(UserMixin, db.Model):
     # Timestamp for account creation
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # Incremented on every data change - keys the per-user result cache
+    data_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    
     # Relationships - cascade delete ensures user data is removed when user is deleted
     categories = db.relationship('Category', backref='user', lazy='dynamic', cascade='all, delete-orphan')
     expenses = db.relationship('Expense', backref='user', lazy='dynamic', cascade='all, delete-orphan')
@@ -39,11 +41,18 @@ class User(UserMixin, db.Model):
     
     def set_password(self, password):
         """Hash and store password - never store plain text passwords."""
-        self.password_hash = generate_password_hash(password, method='pbkdf2:sha256')
+        from app.services.passwords import hash_password
+        self.password_hash = hash_password(password)
     
     def check_password(self, password):
         """Verify password against stored hash."""
-        return check_password_hash(self.password_hash, password)
+        from app.services.passwords import verify_password
+        return verify_password(self.password_hash, password)
+    
+    def password_needs_rehash(self):
+        """True if the stored hash uses outdated method or cost settings."""
+        from app.services.passwords import needs_rehash
+        return needs_rehash(self.password_hash)
     
     def __repr__(self):
         return f'<User {self.email}>'
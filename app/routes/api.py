@@ -0,0 +1,76 @@
+"""
+JSON API routes - Batch endpoints for sync clients and dashboard data.
+"""
+
+from flask import Blueprint, current_app, jsonify, request
+from flask_login import current_user
+from app.services import refdata
+from app.services.anomalies import detect_anomalies
+from app.services.cache import get_or_set, user_cache_key
+from app.services.expense_batch import apply_expense_batch
+from app.services.forecast import build_forecast, forecast_available
+from app.services.search import search_expenses
+from app.utils.money import from_minor
+
+api_bp = Blueprint('api', __name__)
+
+@api_bp.before_request
+def require_login():
+    """Answer unauthenticated API calls with 401 JSON instead of a login redirect."""
+    if not current_user.is_authenticated:
+        return jsonify(error='authentication required'), 401
+
+@api_bp.route('/expenses/batch', methods=['POST'])
+def expenses_batch():
+    """
+    Apply an array of expense create/update/delete operations in one
+    transaction. Body: {"operations": [...]} or a bare array.
+    Returns per-item results in request order.
+    """
+    payload = request.get_json(silent=True)
+    operations = payload.get('operations') if isinstance(payload, dict) else payload
+    if not isinstance(operations, list):
+        return jsonify(error='expected a JSON array of operations'), 400
+    
+    limit = current_app.config['API_BATCH_MAX_OPERATIONS']
+    if len(operations) > limit:
+        return jsonify(error=f'batches are limited to {limit} operations'), 413
+    
+    results = apply_expense_batch(current_user.user_id, operations)
+    failed = sum(1 for r in results if r['status'] == 'error')
+    return jsonify(applied=len(results) - failed, failed=failed, results=results)
+
+@api_bp.route('/expenses/search')
+def expenses_search():
+    """Expenses matching ?q= in their description or category, best match first (?limit=, default 20)."""
+    limit = min(max(request.args.get('limit', 20, type=int), 1), current_app.config['API_SEARCH_MAX_RESULTS'])
+    expenses = search_expenses(current_user.user_id, request.args.get('q', ''), limit)
+    names = {c.category_id: c.category_name for c in refdata.get_categories(current_user.user_id)}
+    return jsonify(results=[
+        {
+            'expense_id': e.expense_id,
+            'category_id': e.category_id,
+            'category': names.get(e.category_id, ''),
+            'date': e.expense_date.isoformat(),
+            'amount': from_minor(e.amount_minor),
+            'description': e.description,
+        }
+        for e in expenses
+    ])
+
+@api_bp.route('/forecast')
+def forecast():
+    """Month-end spend projection with the daily series and rolling averages."""
+    if not forecast_available():
+        return jsonify(error='forecasting requires NumPy (pip install numpy)'), 503
+    data = get_or_set(user_cache_key('forecast_series'),
+                      lambda: build_forecast(current_user.user_id, include_series=True))
+    return jsonify(data)
+
+@api_bp.route('/anomalies')
+def anomalies():
+    """Unusual category spending this month and unusually large recent expenses."""
+    if not forecast_available():
+        return jsonify(error='anomaly detection requires NumPy (pip install numpy)'), 503
+    data = get_or_set(user_cache_key('anomalies'), lambda: detect_anomalies(current_user.user_id))
+    return jsonify(data)
@@ -7,6 +7,8 @@ from flask import Blueprint, render_template, redirect, url_for, flash, request
 from flask_login import login_user, logout_user, login_required, current_user
 from app import db
 from app.models.user import User
+from app.services import refdata
+from app.services.passwords import PasswordHasherBusy
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -46,7 +48,11 @@ def register():
         
         # Create new user with hashed password
         user = User(name=name, email=email)
-        user.set_password(password)
+        try:
+            user.set_password(password)
+        except PasswordHasherBusy:
+            flash('The server is busy. Please try again in a moment.', 'warning')
+            return render_template('auth/register.html'), 503
         db.session.add(user)
         db.session.commit()
         
@@ -67,7 +73,21 @@ def login():
         
         user = User.query.filter_by(email=email).first()
         
-        if user and user.check_password(password):
+        try:
+            valid = user is not None and user.check_password(password)
+        except PasswordHasherBusy:
+            flash('The server is busy. Please try again in a moment.', 'warning')
+            return render_template('auth/login.html'), 503
+        
+        if valid:
+            # Upgrade hashes made with an older method or cost while we have the password
+            if user.password_needs_rehash():
+                try:
+                    user.set_password(password)
+                    db.session.commit()
+                    refdata.invalidate_user(user.user_id)
+                except PasswordHasherBusy:
+                    pass
             login_user(user, remember=request.form.get('remember', False))
             flash(f'Welcome back, {user.name}!', 'success')
             next_page = request.args.get('next') or url_for('main.dashboard')
@@ -5,10 +5,11 @@ Budget management routes - Set and view monthly budgets.
 from datetime import datetime
 from flask import Blueprint, render_template, redirect, url_for, flash, request
 from flask_login import login_required, current_user
-from sqlalchemy import func, extract
 from app import db
 from app.models.budget import Budget
-from app.models.expense import Expense
+from app.services.budgets import get_budget_status
+from app.services.cache import bump_data_version
+from app.utils.money import to_minor
 
 budgets_bp = Blueprint('budgets', __name__)
 
@@ -20,19 +21,8 @@ def list_budgets():
         user_id=current_user.user_id
     ).order_by(Budget.year.desc(), Budget.month.desc()).limit(12).all()
     
-    # Get actual expenses for each budget
-    budget_data = []
-    for b in budgets:
-        spent = db.session.query(func.sum(Expense.amount)).filter(
-            Expense.user_id == current_user.user_id,
-            extract('month', Expense.expense_date) == b.month,
-            extract('year', Expense.expense_date) == b.year
-        ).scalar() or 0
-        budget_data.append({
-            'budget': b,
-            'spent': float(spent),
-            'remaining': b.amount - float(spent)
-        })
+    # Actual spend for all budgets in one grouped query
+    budget_data = get_budget_status(budgets)
     
     return render_template('budgets/list.html', budget_data=budget_data)
 
@@ -44,9 +34,9 @@ def add_budget():
         try:
             month = int(request.form.get('month'))
             year = int(request.form.get('year'))
-            amount = float(request.form.get('amount', 0))
+            amount_minor = to_minor(request.form.get('amount', 0))
             
-            if amount <= 0:
+            if amount_minor <= 0:
                 flash('Budget amount must be positive.', 'danger')
                 return render_template('budgets/form.html', now=datetime.now())
             if month < 1 or month > 12:
@@ -60,7 +50,8 @@ def add_budget():
             ).first()
             
             if existing:
-                existing.amount = amount
+                existing.amount_minor = amount_minor
+                bump_data_version(current_user.user_id)
                 db.session.commit()
                 flash(f'Budget for {month}/{year} updated!', 'success')
             else:
@@ -68,9 +59,10 @@ def add_budget():
                     user_id=current_user.user_id,
                     month=month,
                     year=year,
-                    amount=amount
+                    amount_minor=amount_minor
                 )
                 db.session.add(budget)
+                bump_data_version(current_user.user_id)
                 db.session.commit()
                 flash(f'Budget for {month}/{year} set successfully!', 'success')
             
@@ -6,6 +6,11 @@ from flask import Blueprint, render_template, redirect, url_for, flash, request
 from flask_login import login_required, current_user
 from app import db
 from app.models.category import Category
+from app.models.expense import Expense
+from app.models.recurring import RecurringRule
+from app.services import refdata, rollups
+from app.services.cache import bump_data_version
+from app.services.categories import merge_categories
 
 categories_bp = Blueprint('categories', __name__)
 
@@ -41,23 +46,60 @@ def add_category():
         
         category = Category(user_id=current_user.user_id, category_name=name)
         db.session.add(category)
+        bump_data_version(current_user.user_id)
         db.session.commit()
+        refdata.invalidate_categories(current_user.user_id)
         flash(f'Category "{name}" added successfully!', 'success')
         return redirect(url_for('categories.list_categories'))
     
     return render_template('categories/form.html')
 
+@categories_bp.route('/merge', methods=['POST'])
+@login_required
+def merge_category():
+    """Move the expenses of the selected categories into a target category and delete them."""
+    target_id = request.form.get('target_id', type=int)
+    source_ids = [int(c) for c in request.form.getlist('source_ids') if c.isdigit() and int(c) != target_id]
+    names = {c.category_id: c.category_name for c in refdata.get_categories(current_user.user_id)}
+    
+    if target_id not in names or not source_ids or not set(source_ids) <= set(names):
+        flash('Select the categories to merge and a different category to merge them into.', 'danger')
+        return redirect(url_for('categories.list_categories'))
+    
+    moved = merge_categories(current_user.user_id, source_ids, target_id)
+    merged = ', '.join(f'"{names[c]}"' for c in source_ids)
+    flash(f'Merged {merged} into "{names[target_id]}" ({moved} expenses moved).', 'success')
+    return redirect(url_for('categories.list_categories'))
+
 @categories_bp.route('/delete/<int:category_id>', methods=['POST'])
 @login_required
 def delete_category(category_id):
-    """Delete category - expenses in this category will be affected (CASCADE)."""
+    """
+    Delete category. With move_to its expenses are merged into that category
+    first; otherwise they are deleted along with it.
+    """
     category = Category.query.filter_by(
         category_id=category_id,
         user_id=current_user.user_id
     ).first_or_404()
     
     name = category.category_name
+    move_to = request.form.get('move_to', type=int)
+    if move_to and move_to != category_id:
+        if not refdata.owns_category(current_user.user_id, move_to):
+            flash('Invalid category selected.', 'danger')
+            return redirect(url_for('categories.list_categories'))
+        moved = merge_categories(current_user.user_id, [category_id], move_to)
+        flash(f'Category "{name}" deleted. {moved} expenses were moved.', 'info')
+        return redirect(url_for('categories.list_categories'))
+    
+    # Delete linked expenses and their rollups in bulk, then the category itself
+    rollups.remove_category(category.category_id)
+    Expense.query.filter_by(category_id=category.category_id).delete(synchronize_session=False)
+    RecurringRule.query.filter_by(category_id=category.category_id).delete(synchronize_session=False)
     db.session.delete(category)
+    bump_data_version(current_user.user_id)
     db.session.commit()
+    refdata.invalidate_categories(current_user.user_id)
     flash(f'Category "{name}" deleted. Related expenses were also removed.', 'info')
     return redirect(url_for('categories.list_categories'))
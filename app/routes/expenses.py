@@ -3,43 +3,55 @@ Expense management routes - CRUD operations for expenses.
 """
 
 from datetime import datetime
-from flask import Blueprint, render_template, redirect, url_for, flash, request
+from flask import Blueprint, render_template, redirect, url_for, flash, request, current_app
 from flask_login import login_required, current_user
-from sqlalchemy import extract
 from app import db
 from app.models.expense import Expense
-from app.models.category import Category
+from app.services import refdata, rollups
+from app.services.cache import bump_data_version, get_or_set, user_cache_key
+from app.services.importer import DEFAULT_ENCODING, IMPORT_ENCODINGS, import_expenses_csv, import_summary
+from app.services.recurring import materialize_for_user
+from app.services.search import expense_search_filter
+from app.utils.dates import date_filters
+from app.utils.pagination import keyset_paginate
+from app.utils.money import to_minor
 
 expenses_bp = Blueprint('expenses', __name__)
 
 def get_user_categories():
-    """Helper to get categories for current user."""
-    return Category.query.filter_by(user_id=current_user.user_id).order_by(Category.category_name).all()
+    """Helper to get categories for current user (cached reference data)."""
+    return refdata.get_categories(current_user.user_id)
 
 @expenses_bp.route('/')
 @login_required
 def list_expenses():
-    """List all expenses for current user with optional filters."""
-    page = request.args.get('page', 1, type=int)
+    """List all expenses for current user with optional filters and search (cursor paginated)."""
+    cursor = request.args.get('cursor')
     category_filter = request.args.get('category', type=int)
     month_filter = request.args.get('month', type=int)
     year_filter = request.args.get('year', type=int)
+    search = request.args.get('q', '').strip()
+    materialize_for_user(current_user.user_id)
     
     query = Expense.query.filter_by(user_id=current_user.user_id)
     
     if category_filter:
         query = query.filter_by(category_id=category_filter)
-    if month_filter:
-        query = query.filter(extract('month', Expense.expense_date) == month_filter)
-    if year_filter:
-        query = query.filter(extract('year', Expense.expense_date) == year_filter)
+    query = query.filter(*date_filters(Expense.expense_date, month_filter, year_filter))
+    if search:
+        query = query.filter(*expense_search_filter(search, current_user.user_id))
     
-    expenses = query.order_by(Expense.expense_date.desc()).paginate(page=page, per_page=10)
+    expenses = keyset_paginate(query, Expense.expense_date, Expense.expense_id, cursor, per_page=10)
+    if current_app.config['LIST_SHOW_TOTALS']:
+        count_key = user_cache_key('expense_count', category_filter, month_filter, year_filter, search)
+        expenses.total = get_or_set(count_key, query.count)
     
+    categories = get_user_categories()
     return render_template(
         'expenses/list.html',
         expenses=expenses,
-        categories=get_user_categories()
+        categories=categories,
+        category_names={c.category_id: c.category_name for c in categories}
     )
 
 @expenses_bp.route('/add', methods=['GET', 'POST'])
@@ -53,21 +65,17 @@ def add_expense():
     
     if request.method == 'POST':
         try:
-            amount = float(request.form.get('amount', 0))
+            amount_minor = to_minor(request.form.get('amount', 0))
             category_id = int(request.form.get('category_id'))
             date_str = request.form.get('expense_date')
             description = request.form.get('description', '').strip()
             
-            if amount <= 0:
+            if amount_minor <= 0:
                 flash('Amount must be positive.', 'danger')
                 return render_template('expenses/form.html', categories=categories)
             
             # Verify category belongs to user
-            category = Category.query.filter_by(
-                category_id=category_id,
-                user_id=current_user.user_id
-            ).first()
-            if not category:
+            if not refdata.owns_category(current_user.user_id, category_id):
                 flash('Invalid category selected.', 'danger')
                 return render_template('expenses/form.html', categories=categories)
             
@@ -76,11 +84,13 @@ def add_expense():
             expense = Expense(
                 user_id=current_user.user_id,
                 category_id=category_id,
-                amount=amount,
+                amount_minor=amount_minor,
                 expense_date=expense_date,
                 description=description
             )
             db.session.add(expense)
+            rollups.track_expense(expense)
+            bump_data_version(current_user.user_id)
             db.session.commit()
             flash('Expense added successfully!', 'success')
             return redirect(url_for('expenses.list_expenses'))
@@ -103,27 +113,29 @@ def edit_expense(expense_id):
     
     if request.method == 'POST':
         try:
-            amount = float(request.form.get('amount', 0))
+            amount_minor = to_minor(request.form.get('amount', 0))
             category_id = int(request.form.get('category_id'))
             date_str = request.form.get('expense_date')
             description = request.form.get('description', '').strip()
             
-            if amount <= 0:
+            if amount_minor <= 0:
                 flash('Amount must be positive.', 'danger')
                 return render_template('expenses/form.html', expense=expense, categories=categories)
             
-            category = Category.query.filter_by(
-                category_id=category_id,
-                user_id=current_user.user_id
-            ).first()
-            if not category:
+            if not refdata.owns_category(current_user.user_id, category_id):
                 flash('Invalid category selected.', 'danger')
                 return render_template('expenses/form.html', expense=expense, categories=categories)
             
-            expense.amount = amount
+            new_date = datetime.strptime(date_str, '%Y-%m-%d').date()
+            
+            # Move the expense out of its old rollup and into the new one
+            rollups.track_expense(expense, sign=-1)
+            expense.amount_minor = amount_minor
             expense.category_id = category_id
-            expense.expense_date = datetime.strptime(date_str, '%Y-%m-%d').date()
+            expense.expense_date = new_date
             expense.description = description
+            rollups.track_expense(expense)
+            bump_data_version(current_user.user_id)
             db.session.commit()
             flash('Expense updated successfully!', 'success')
             return redirect(url_for('expenses.list_expenses'))
@@ -142,7 +154,31 @@ def delete_expense(expense_id):
         user_id=current_user.user_id
     ).first_or_404()
     
+    rollups.track_expense(expense, sign=-1)
+    bump_data_version(current_user.user_id)
     db.session.delete(expense)
     db.session.commit()
     flash('Expense deleted successfully.', 'success')
     return redirect(url_for('expenses.list_expenses'))
+
+@expenses_bp.route('/import', methods=['GET', 'POST'])
+@login_required
+def import_expenses():
+    """Bulk import expenses from a CSV file (date, amount, category, description)."""
+    if request.method == 'POST':
+        upload = request.files.get('file')
+        if not upload or not upload.filename:
+            flash('Please choose a CSV file to import.', 'danger')
+            return render_template('expenses/import.html', encodings=IMPORT_ENCODINGS)
+        
+        encoding = request.form.get('encoding')
+        if encoding not in IMPORT_ENCODINGS:
+            encoding = DEFAULT_ENCODING
+        result = import_expenses_csv(current_user.user_id, upload.stream, encoding=encoding)
+        level = 'warning' if result['stopped'] else 'success' if result['imported'] else 'info'
+        flash(import_summary(result, 'expenses'), level)
+        if result['failed']:
+            flash(f"{result['failed']} rows could not be read. " + ' '.join(result['errors'][:5]), 'warning')
+        return redirect(url_for('expenses.list_expenses'))
+    
+    return render_template('expenses/import.html', encodings=IMPORT_ENCODINGS)
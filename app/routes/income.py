@@ -3,21 +3,30 @@ Income management routes - Add and view income.
 """
 
 from datetime import datetime
-from flask import Blueprint, render_template, redirect, url_for, flash, request
+from flask import Blueprint, render_template, redirect, url_for, flash, request, current_app
 from flask_login import login_required, current_user
 from app import db
 from app.models.income import Income
+from app.services import rollups
+from app.services.cache import bump_data_version, get_or_set, user_cache_key
+from app.services.importer import DEFAULT_ENCODING, IMPORT_ENCODINGS, import_income_csv, import_summary
+from app.services.recurring import materialize_for_user
+from app.utils.pagination import keyset_paginate
+from app.utils.money import to_minor
 
 income_bp = Blueprint('income', __name__)
 
 @income_bp.route('/')
 @login_required
 def list_income():
-    """List all income entries with pagination."""
-    page = request.args.get('page', 1, type=int)
-    income_records = Income.query.filter_by(
-        user_id=current_user.user_id
-    ).order_by(Income.income_date.desc()).paginate(page=page, per_page=10)
+    """List all income entries with cursor pagination."""
+    materialize_for_user(current_user.user_id)
+    query = Income.query.filter_by(user_id=current_user.user_id)
+    income_records = keyset_paginate(
+        query, Income.income_date, Income.income_id, request.args.get('cursor'), per_page=10
+    )
+    if current_app.config['LIST_SHOW_TOTALS']:
+        income_records.total = get_or_set(user_cache_key('income_count'), query.count)
     
     return render_template('income/list.html', income_records=income_records)
 
@@ -27,11 +36,11 @@ def add_income():
     """Add new income entry."""
     if request.method == 'POST':
         try:
-            amount = float(request.form.get('amount', 0))
+            amount_minor = to_minor(request.form.get('amount', 0))
             date_str = request.form.get('income_date')
             source = request.form.get('source', 'Salary').strip() or 'Salary'
             
-            if amount <= 0:
+            if amount_minor <= 0:
                 flash('Amount must be positive.', 'danger')
                 return render_template('income/form.html')
             
@@ -39,11 +48,13 @@ def add_income():
             
             income = Income(
                 user_id=current_user.user_id,
-                amount=amount,
+                amount_minor=amount_minor,
                 income_date=income_date,
                 source=source
             )
             db.session.add(income)
+            rollups.track_income(income)
+            bump_data_version(current_user.user_id)
             db.session.commit()
             flash('Income added successfully!', 'success')
             return redirect(url_for('income.list_income'))
@@ -52,3 +63,25 @@ def add_income():
             flash(f'Invalid input: {str(e)}', 'danger')
     
     return render_template('income/form.html')
+
+@income_bp.route('/import', methods=['GET', 'POST'])
+@login_required
+def import_income():
+    """Bulk import income from a CSV file (date, amount, source)."""
+    if request.method == 'POST':
+        upload = request.files.get('file')
+        if not upload or not upload.filename:
+            flash('Please choose a CSV file to import.', 'danger')
+            return render_template('income/import.html', encodings=IMPORT_ENCODINGS)
+        
+        encoding = request.form.get('encoding')
+        if encoding not in IMPORT_ENCODINGS:
+            encoding = DEFAULT_ENCODING
+        result = import_income_csv(current_user.user_id, upload.stream, encoding=encoding)
+        level = 'warning' if result['stopped'] else 'success' if result['imported'] else 'info'
+        flash(import_summary(result, 'income records'), level)
+        if result['failed']:
+            flash(f"{result['failed']} rows could not be read. " + ' '.join(result['errors'][:5]), 'warning')
+        return redirect(url_for('income.list_income'))
+    
+    return render_template('income/import.html', encodings=IMPORT_ENCODINGS)
@@ -3,93 +3,152 @@ Main routes - Dashboard, home, and financial insights.
 Contains analytics logic and Chart.js data.
 """
 
-from datetime import datetime, timedelta
-from flask import Blueprint, render_template, redirect, url_for
+from datetime import date
+from flask import Blueprint, render_template, redirect, url_for, g, abort, current_app, jsonify, request
 from flask_login import login_required, current_user
-from sqlalchemy import func, extract
 from app import db
-from app.models.expense import Expense
-from app.models.income import Income
 from app.models.budget import Budget
 from app.models.category import Category
+from app.models.rollup import ExpenseRollup, IncomeRollup
+from app.services.budgets import get_budget_status
+from app.services.anomalies import detect_anomalies
+from app.services.cache import cached_per_user, user_etag
+from app.services.forecast import build_forecast, forecast_available
+from app.services.recurring import materialize_for_user
+from app.services.rollups import month_span
+from app.utils.money import from_minor
 
 main_bp = Blueprint('main', __name__)
 
-def get_current_month_data():
-    """Get total income and expenses for current month."""
-    now = datetime.now()
-    income_total = db.session.query(func.sum(Income.amount)).filter(
-        Income.user_id == current_user.user_id,
-        extract('month', Income.income_date) == now.month,
-        extract('year', Income.income_date) == now.year
-    ).scalar() or 0
+# Number of calendar months loaded for dashboard charts
+DASHBOARD_MONTHS = 6
+
+def get_month_window(months, today=None):
+    """Return the last N calendar months as (year, month) tuples, oldest first."""
+    today = today or date.today()
+    year, month = today.year, today.month
+    window = []
+    for _ in range(months):
+        window.append((year, month))
+        month -= 1
+        if month == 0:
+            month = 12
+            year -= 1
+    window.reverse()
+    return window
+
+def get_dashboard_totals(months=DASHBOARD_MONTHS):
+    """
+    Load every income, expense and category total for the dashboard window.
+    Totals come from the monthly rollup tables (one query each) as integer
+    paise, and the result is kept on `g` so cards, charts and insights share
+    it per request; the helpers below convert to rupees for display.
+    """
+    months = max(months, DASHBOARD_MONTHS)
+    cache = g.setdefault('dashboard_totals', {})
+    if months in cache:
+        return cache[months]
+    
+    window = get_month_window(months)
+    totals = {
+        'window': window,
+        'income': {ym: 0 for ym in window},
+        'expense': {ym: 0 for ym in window},
+        'categories': {ym: {} for ym in window},
+    }
+    
+    expense_rows = db.session.query(
+        ExpenseRollup.year,
+        ExpenseRollup.month,
+        Category.category_name,
+        ExpenseRollup.total_minor
+    ).join(Category, Category.category_id == ExpenseRollup.category_id).filter(
+        ExpenseRollup.user_id == current_user.user_id,
+        month_span(ExpenseRollup, window[0], window[-1]),
+        ExpenseRollup.count > 0
+    ).all()
     
-    expense_total = db.session.query(func.sum(Expense.amount)).filter(
-        Expense.user_id == current_user.user_id,
-        extract('month', Expense.expense_date) == now.month,
-        extract('year', Expense.expense_date) == now.year
-    ).scalar() or 0
+    for r in expense_rows:
+        ym = (r.year, r.month)
+        totals['expense'][ym] += r.total_minor
+        totals['categories'][ym][r.category_name] = r.total_minor
     
-    return float(income_total), float(expense_total)
+    income_rows = db.session.query(
+        IncomeRollup.year,
+        IncomeRollup.month,
+        IncomeRollup.total_minor
+    ).filter(
+        IncomeRollup.user_id == current_user.user_id,
+        month_span(IncomeRollup, window[0], window[-1])
+    ).all()
+    
+    for r in income_rows:
+        totals['income'][(r.year, r.month)] = r.total_minor
+    
+    cache[months] = totals
+    return totals
 
+@cached_per_user('current_month_data')
+def get_current_month_data():
+    """Get total income and expenses for current month."""
+    totals = get_dashboard_totals()
+    current = totals['window'][-1]
+    return from_minor(totals['income'][current]), from_minor(totals['expense'][current])
+
+@cached_per_user('category_breakdown')
 def get_category_breakdown():
     """Get expense totals per category for current month."""
-    now = datetime.now()
-    results = db.session.query(
-        Category.category_name,
-        func.sum(Expense.amount).label('total')
-    ).join(Expense).filter(
-        Expense.user_id == current_user.user_id,
-        extract('month', Expense.expense_date) == now.month,
-        extract('year', Expense.expense_date) == now.year
-    ).group_by(Category.category_name).all()
-    
-    return [{'name': r.category_name, 'amount': float(r.total)} for r in results]
+    totals = get_dashboard_totals()
+    breakdown = totals['categories'][totals['window'][-1]]
+    return [{'name': name, 'amount': from_minor(breakdown[name])} for name in sorted(breakdown)]
 
+@cached_per_user('monthly_expense_trend')
 def get_monthly_expense_trend(months=6):
     """Get expense totals for last N months for line chart."""
-    now = datetime.now()
-    data = []
-    for i in range(months - 1, -1, -1):
-        target_date = now - timedelta(days=30 * i)
-        total = db.session.query(func.sum(Expense.amount)).filter(
-            Expense.user_id == current_user.user_id,
-            extract('month', Expense.expense_date) == target_date.month,
-            extract('year', Expense.expense_date) == target_date.year
-        ).scalar() or 0
-        data.append({
-            'month': target_date.strftime('%b %Y'),
-            'amount': float(total)
-        })
-    return data
+    totals = get_dashboard_totals(months)
+    return [
+        {
+            'month': date(year, month, 1).strftime('%b %Y'),
+            'amount': from_minor(totals['expense'][(year, month)])
+        }
+        for year, month in totals['window'][-months:]
+    ]
 
+@cached_per_user('income_vs_expense')
 def get_income_vs_expense_data(months=6):
     """Get income and expense totals per month for bar chart comparison."""
-    now = datetime.now()
+    totals = get_dashboard_totals(months)
     data = []
-    for i in range(months - 1, -1, -1):
-        target_date = now - timedelta(days=30 * i)
-        income = db.session.query(func.sum(Income.amount)).filter(
-            Income.user_id == current_user.user_id,
-            extract('month', Income.income_date) == target_date.month,
-            extract('year', Income.income_date) == target_date.year
-        ).scalar() or 0
-        expense = db.session.query(func.sum(Expense.amount)).filter(
-            Expense.user_id == current_user.user_id,
-            extract('month', Expense.expense_date) == target_date.month,
-            extract('year', Expense.expense_date) == target_date.year
-        ).scalar() or 0
+    for ym in totals['window'][-months:]:
+        income = totals['income'][ym]
+        expense = totals['expense'][ym]
         data.append({
-            'month': target_date.strftime('%b %Y'),
-            'income': float(income),
-            'expense': float(expense),
-            'savings': float(income) - float(expense)
+            'month': date(ym[0], ym[1], 1).strftime('%b %Y'),
+            'income': from_minor(income),
+            'expense': from_minor(expense),
+            'savings': from_minor(income - expense)
         })
     return data
 
+@cached_per_user('spend_forecast')
+def get_spend_forecast():
+    """Month-end projection for the current user, or None without NumPy."""
+    if not forecast_available():
+        return None
+    return build_forecast(current_user.user_id)
+
+@cached_per_user('spending_anomalies')
+def get_spending_anomalies():
+    """Unusual categories and expenses for the current user, or None without NumPy."""
+    if not forecast_available():
+        return None
+    return detect_anomalies(current_user.user_id)
+
+@cached_per_user('financial_insights')
 def get_financial_insights():
     """Generate automated text-based financial insights."""
-    now = datetime.now()
+    totals = get_dashboard_totals()
+    current_year, current_month = totals['window'][-1]
     insights = []
     
     # Current month totals
@@ -109,19 +168,7 @@ def get_financial_insights():
             insights.append("Warning: You're spending more than you earn this month. Review expenses.")
     
     # Month-over-month comparison
-    if now.month > 1:
-        prev_month = now.month - 1
-        prev_year = now.year
-    else:
-        prev_month = 12
-        prev_year = now.year - 1
-    
-    prev_expense = db.session.query(func.sum(Expense.amount)).filter(
-        Expense.user_id == current_user.user_id,
-        extract('month', Expense.expense_date) == prev_month,
-        extract('year', Expense.expense_date) == prev_year
-    ).scalar() or 0
-    prev_expense = float(prev_expense)
+    prev_expense = from_minor(totals['expense'][totals['window'][-2]])
     
     if prev_expense > 0 and expense_total > prev_expense * 1.1:
         increase = ((expense_total - prev_expense) / prev_expense) * 100
@@ -133,16 +180,34 @@ def get_financial_insights():
     # Budget check
     budget = Budget.query.filter_by(
         user_id=current_user.user_id,
-        month=now.month,
-        year=now.year
+        month=current_month,
+        year=current_year
     ).first()
     
-    if budget and expense_total > budget.amount:
-        over = expense_total - budget.amount
-        insights.append(f"Budget exceeded by ₹{over:,.2f}. Consider cutting non-essential spending.")
-    elif budget and expense_total > budget.amount * 0.9:
-        remaining = budget.amount - expense_total
-        insights.append(f"Approaching budget limit. ₹{remaining:,.2f} remaining for this month.")
+    if budget:
+        status = get_budget_status([budget])[0]
+        if status['remaining'] < 0:
+            insights.append(f"Budget exceeded by ₹{-status['remaining']:,.2f}. Consider cutting non-essential spending.")
+        elif status['percent_used'] > 90:
+            insights.append(f"Approaching budget limit. ₹{status['remaining']:,.2f} remaining for this month.")
+    
+    # Projected budget exhaustion
+    forecast = get_spend_forecast()
+    if forecast and forecast['budget_exhausted_on'] and not (budget and status['remaining'] < 0):
+        exhausted_on = date.fromisoformat(forecast['budget_exhausted_on']).strftime('%d %b')
+        insights.append(f"At your current pace the budget runs out around {exhausted_on}; "
+                        f"projected month-end spend is ₹{forecast['projected_expense']:,.2f}.")
+    
+    # Unusual categories and single expenses
+    anomalies = get_spending_anomalies()
+    if anomalies:
+        for item in anomalies['categories']:
+            insights.append(f"Unusual spending on '{item['category']}': ₹{item['spent']:,.2f} so far this month, "
+                            f"against a typical ₹{item['typical']:,.2f} by this point.")
+        for item in anomalies['expenses']:
+            spent_on = date.fromisoformat(item['date']).strftime('%d %b')
+            insights.append(f"₹{item['amount']:,.2f} on '{item['category']}' ({spent_on}) is far above "
+                            f"your usual {item['category']} expense of ₹{item['typical']:,.2f}.")
     
     # Highest spending category
     categories = get_category_breakdown()
@@ -164,7 +229,9 @@ def index():
 @main_bp.route('/dashboard')
 @login_required
 def dashboard():
-    """Main dashboard with analytics and charts."""
+    """Main dashboard with analytics; chart data is fetched from chart_data()."""
+    materialize_for_user(current_user.user_id)
+    # Cards, charts and insights all read the same get_dashboard_totals() load
     income_total, expense_total = get_current_month_data()
     savings = income_total - expense_total
     
@@ -173,8 +240,34 @@ def dashboard():
         income_total=income_total,
         expense_total=expense_total,
         savings=savings,
-        category_data=get_category_breakdown(),
-        monthly_data=get_monthly_expense_trend(),
-        income_vs_expense_data=get_income_vs_expense_data(),
-        insights=get_financial_insights()
+        insights=get_financial_insights(),
+        forecast=get_spend_forecast()
     )
+
+# Dashboard chart datasets served as JSON by chart_data()
+CHARTS = {
+    'categories': get_category_breakdown,
+    'monthly': get_monthly_expense_trend,
+    'income-vs-expense': get_income_vs_expense_data,
+}
+
+@main_bp.route('/dashboard/charts/<name>')
+@login_required
+def chart_data(name):
+    """
+    One dashboard chart's dataset as JSON. The ETag follows the user's data
+    version, so a browser revalidating with If-None-Match gets an empty 304
+    (one version lookup) until the user's data changes.
+    """
+    if name not in CHARTS:
+        abort(404)
+    etag = user_etag('chart', name)
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = jsonify(CHARTS[name]())
+    response.set_etag(etag)
+    # Per-user data: browsers may store it but must revalidate before reuse
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
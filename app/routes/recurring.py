@@ -0,0 +1,117 @@
+"""
+Recurring rule routes - Repeating expenses and income (rent, salary, subscriptions).
+"""
+
+from datetime import date, datetime, timedelta
+from flask import Blueprint, current_app, render_template, redirect, url_for, flash, request
+from flask_login import login_required, current_user
+from app import db
+from app.models.recurring import FREQUENCIES, MAX_INTERVAL, RecurringRule
+from app.services import refdata
+from app.services.cache import bump_data_version
+from app.services.recurring import detach_rule, materialize_due, occurrence_date
+from app.utils.money import to_minor
+
+recurring_bp = Blueprint('recurring', __name__)
+
+@recurring_bp.route('/')
+@login_required
+def list_rules():
+    """List the current user's recurring rules."""
+    rules = RecurringRule.query.filter_by(
+        user_id=current_user.user_id
+    ).order_by(RecurringRule.kind, RecurringRule.start_date).all()
+    
+    categories = refdata.get_categories(current_user.user_id)
+    return render_template(
+        'recurring/list.html',
+        rules=rules,
+        category_names={c.category_id: c.category_name for c in categories}
+    )
+
+@recurring_bp.route('/add', methods=['GET', 'POST'])
+@login_required
+def add_rule():
+    """Add a recurring expense or income; occurrences already due are created at once."""
+    categories = refdata.get_categories(current_user.user_id)
+    
+    if request.method == 'POST':
+        try:
+            kind = request.form.get('kind')
+            amount_minor = to_minor(request.form.get('amount', 0))
+            frequency = request.form.get('frequency')
+            interval = int(request.form.get('interval') or 1)
+            start_date = datetime.strptime(request.form.get('start_date', ''), '%Y-%m-%d').date()
+            end_str = request.form.get('end_date')
+            end_date = datetime.strptime(end_str, '%Y-%m-%d').date() if end_str else None
+            category_id = request.form.get('category_id', type=int)
+            source = request.form.get('source', '').strip() or 'Salary'
+            description = request.form.get('description', '').strip()
+            
+            if kind not in ('expense', 'income') or frequency not in FREQUENCIES:
+                flash('Choose a type and a frequency.', 'danger')
+                return render_template('recurring/form.html', categories=categories, frequencies=FREQUENCIES)
+            if amount_minor <= 0 or interval < 1:
+                flash('Amount and interval must be positive.', 'danger')
+                return render_template('recurring/form.html', categories=categories, frequencies=FREQUENCIES)
+            if interval > MAX_INTERVAL:
+                flash(f'Interval can be at most {MAX_INTERVAL}.', 'danger')
+                return render_template('recurring/form.html', categories=categories, frequencies=FREQUENCIES)
+            if end_date and end_date < start_date:
+                flash('End date must be on or after the start date.', 'danger')
+                return render_template('recurring/form.html', categories=categories, frequencies=FREQUENCIES)
+            oldest = date.today() - timedelta(days=current_app.config['RECURRING_MAX_BACKFILL_DAYS'])
+            if start_date < oldest:
+                flash(f'Start date can be no earlier than {oldest.isoformat()}.', 'danger')
+                return render_template('recurring/form.html', categories=categories, frequencies=FREQUENCIES)
+            try:
+                # The schedule must have a representable second occurrence
+                occurrence_date(start_date, frequency, interval, 1)
+            except (ValueError, OverflowError):
+                flash('Start date is too far in the future for this schedule.', 'danger')
+                return render_template('recurring/form.html', categories=categories, frequencies=FREQUENCIES)
+            if kind == 'expense' and not refdata.owns_category(current_user.user_id, category_id):
+                flash('Invalid category selected.', 'danger')
+                return render_template('recurring/form.html', categories=categories, frequencies=FREQUENCIES)
+            
+            rule = RecurringRule(
+                user_id=current_user.user_id,
+                kind=kind,
+                category_id=category_id if kind == 'expense' else None,
+                source=source if kind == 'income' else None,
+                description=description,
+                amount_minor=amount_minor,
+                frequency=frequency,
+                interval=interval,
+                start_date=start_date,
+                end_date=end_date,
+                next_date=start_date
+            )
+            db.session.add(rule)
+            db.session.commit()
+            
+            created = materialize_due(user_ids=[current_user.user_id])
+            added = created['expenses'] + created['income']
+            flash(f'Recurring {kind} added' + (f' ({added} past occurrences created).' if added else '.'), 'success')
+            return redirect(url_for('recurring.list_rules'))
+        
+        except ValueError as e:
+            flash(f'Invalid input: {str(e)}', 'danger')
+    
+    return render_template('recurring/form.html', categories=categories, frequencies=FREQUENCIES)
+
+@recurring_bp.route('/delete/<int:rule_id>', methods=['POST'])
+@login_required
+def delete_rule(rule_id):
+    """Stop a recurring rule; entries it already created are kept."""
+    rule = RecurringRule.query.filter_by(
+        rule_id=rule_id,
+        user_id=current_user.user_id
+    ).first_or_404()
+    
+    detach_rule(rule.rule_id)
+    db.session.delete(rule)
+    bump_data_version(current_user.user_id)
+    db.session.commit()
+    flash('Recurring rule deleted. Entries it created were kept.', 'info')
+    return redirect(url_for('recurring.list_rules'))
@@ -1,153 +1,135 @@
 """
-Reports routes - PDF and Excel export.
+Reports routes - PDF and Excel export, inline or as background jobs.
 """
 
 from datetime import datetime
-from io import BytesIO
-from flask import Blueprint, send_file, flash, redirect, url_for, request
+from tempfile import SpooledTemporaryFile
+from flask import Blueprint, send_file, flash, redirect, url_for, request, current_app, jsonify, abort
 from flask_login import login_required, current_user
-from sqlalchemy import func, extract
-from app import db
-from app.models.expense import Expense
-from app.models.income import Income
-from app.models.category import Category
+from app.services.cache import get_data_version
+from app.services.reports import (
+    REPORT_TYPES, artifact_path, describe_report, get_job_status,
+    parse_job_id, render_report, submit_report_job
+)
+from app.utils.dates import check_year_month, months_between, parse_year_month
 
 reports_bp = Blueprint('reports', __name__)
 
+def get_report_period():
+    """
+    Read the report period from the request as ((year, month), (year, month)).
+    Accepts ?start=YYYY-MM&end=YYYY-MM (inclusive) or ?month=&year= for one month,
+    defaulting to the current month. Raises ValueError for invalid periods.
+    """
+    if request.values.get('start'):
+        start = parse_year_month(request.values['start'])
+        end = parse_year_month(request.values.get('end') or request.values['start'])
+    else:
+        month = request.values.get('month', datetime.now().month, type=int)
+        year = request.values.get('year', datetime.now().year, type=int)
+        check_year_month(year, month)
+        start = end = (year, month)
+    
+    span = months_between(start, end)
+    if span < 1:
+        raise ValueError('end is before start')
+    if span > current_app.config['REPORT_MAX_MONTHS']:
+        raise ValueError(f"periods are limited to {current_app.config['REPORT_MAX_MONTHS']} months")
+    return start, end
+
+def send_report(report_type):
+    """Render a report for the requested period in this request and send it."""
+    try:
+        start, end = get_report_period()
+    except ValueError as e:
+        flash(f'Invalid report period: {str(e)}', 'danger')
+        return redirect(url_for('main.dashboard'))
+    
+    # Output goes to a temp file that spills to disk past REPORT_SPOOL_MAX_SIZE
+    spool = SpooledTemporaryFile(max_size=current_app.config['REPORT_SPOOL_MAX_SIZE'])
+    render_report(report_type, spool, current_user.user_id, start, end)
+    spool.seek(0)
+    
+    _, filename = describe_report(report_type, start, end)
+    return send_file(spool, mimetype=REPORT_TYPES[report_type]['mimetype'],
+                     as_attachment=True, download_name=filename)
+
 @reports_bp.route('/pdf')
 @login_required
 def download_pdf():
-    """Generate and download monthly expense report as PDF."""
+    """Generate and download expense report (one month up to a year) as PDF."""
     try:
-        from reportlab.lib import colors
-        from reportlab.lib.pagesizes import letter
-        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-        from reportlab.lib.units import inch
+        import reportlab  # noqa: F401
     except ImportError:
         flash('ReportLab not installed. Run: pip install reportlab', 'danger')
         return redirect(url_for('main.dashboard'))
-    
-    month = request.args.get('month', datetime.now().month, type=int)
-    year = request.args.get('year', datetime.now().year, type=int)
-    
-    # Fetch data
-    expenses = Expense.query.filter_by(user_id=current_user.user_id).filter(
-        extract('month', Expense.expense_date) == month,
-        extract('year', Expense.expense_date) == year
-    ).join(Category).order_by(Expense.expense_date).all()
-    
-    income_total = db.session.query(func.sum(Income.amount)).filter(
-        Income.user_id == current_user.user_id,
-        extract('month', Income.income_date) == month,
-        extract('year', Income.income_date) == year
-    ).scalar() or 0
-    expense_total = sum(e.amount for e in expenses)
-    
-    # Create PDF in memory
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter, rightMargin=72, leftMargin=72)
-    styles = getSampleStyleSheet()
-    
-    elements = []
-    title = Paragraph(
-        f"<b>Expense Report - {datetime(year, month, 1).strftime('%B %Y')}</b>",
-        ParagraphStyle(name='Title', fontSize=16, spaceAfter=20)
-    )
-    elements.append(title)
-    elements.append(Spacer(1, 12))
-    
-    # Summary
-    summary_data = [
-        ['Total Income', f'₹{float(income_total):,.2f}'],
-        ['Total Expense', f'₹{expense_total:,.2f}'],
-        ['Savings', f'₹{float(income_total) - expense_total:,.2f}']
-    ]
-    t1 = Table(summary_data)
-    t1.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, -1), colors.lightgrey),
-        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ('TOPPADDING', (0, 0), (-1, -1), 8),
-    ]))
-    elements.append(t1)
-    elements.append(Spacer(1, 20))
-    
-    # Expense details
-    elements.append(Paragraph("<b>Expense Details</b>", styles['Heading2']))
-    elements.append(Spacer(1, 8))
-    
-    exp_data = [['Date', 'Category', 'Amount', 'Description']]
-    for e in expenses:
-        exp_data.append([
-            e.expense_date.strftime('%Y-%m-%d'),
-            e.category.category_name,
-            f'₹{e.amount:,.2f}',
-            (e.description or '')[:50]
-        ])
-    
-    if len(exp_data) > 1:
-        t2 = Table(exp_data, colWidths=[1.2*inch, 1.2*inch, 1*inch, 2.6*inch])
-        t2.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-            ('TOPPADDING', (0, 0), (-1, -1), 6),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-        ]))
-        elements.append(t2)
-    else:
-        elements.append(Paragraph("No expenses for this month.", styles['Normal']))
-    
-    doc.build(elements)
-    buffer.seek(0)
-    
-    filename = f"expense_report_{year}_{month:02d}.pdf"
-    return send_file(buffer, mimetype='application/pdf', as_attachment=True, download_name=filename)
+    return send_report('pdf')
 
 @reports_bp.route('/excel')
 @login_required
 def download_excel():
-    """Export expenses to Excel file."""
+    """Export expenses to Excel file, streamed from a spooled temp file."""
     try:
-        from openpyxl import Workbook
-        from openpyxl.styles import Font, PatternFill, Alignment
+        import openpyxl  # noqa: F401
     except ImportError:
         flash('openpyxl not installed. Run: pip install openpyxl', 'danger')
         return redirect(url_for('main.dashboard'))
+    return send_report('excel')
+
+def job_response(job_id, status):
+    """JSON description of a report job."""
+    data = {
+        'job_id': job_id,
+        'status': status,
+        'status_url': url_for('reports.job_status', job_id=job_id)
+    }
+    if status == 'done':
+        data['download_url'] = url_for('reports.download_job', job_id=job_id)
+    return data
+
+def get_own_job(job_id):
+    """Return the parsed job id if it belongs to the current user, else abort 404."""
+    job = parse_job_id(job_id)
+    if job is None or job[0] != current_user.user_id:
+        abort(404)
+    return job
+
+@reports_bp.route('/jobs', methods=['POST'])
+@login_required
+def create_job():
+    """Queue a PDF or Excel report; returns the job id and its status."""
+    report_type = request.values.get('type', 'pdf')
+    if report_type not in REPORT_TYPES:
+        return jsonify(error=f'Unknown report type: {report_type}'), 400
+    try:
+        start, end = get_report_period()
+    except ValueError as e:
+        return jsonify(error=f'Invalid report period: {str(e)}'), 400
     
-    month = request.args.get('month', datetime.now().month, type=int)
-    year = request.args.get('year', datetime.now().year, type=int)
-    
-    expenses = Expense.query.filter_by(user_id=current_user.user_id).filter(
-        extract('month', Expense.expense_date) == month,
-        extract('year', Expense.expense_date) == year
-    ).join(Category).order_by(Expense.expense_date).all()
-    
-    wb = Workbook()
-    ws = wb.active
-    ws.title = f"Expenses {month}-{year}"
-    
-    headers = ['Date', 'Category', 'Amount', 'Description']
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col, value=header)
-        cell.font = Font(bold=True)
-        cell.fill = PatternFill(start_color='DDDDDD', end_color='DDDDDD', fill_type='solid')
-    
-    for row, exp in enumerate(expenses, 2):
-        ws.cell(row=row, column=1, value=exp.expense_date.strftime('%Y-%m-%d'))
-        ws.cell(row=row, column=2, value=exp.category.category_name)
-        ws.cell(row=row, column=3, value=exp.amount)
-        ws.cell(row=row, column=4, value=exp.description or '')
-    
-    buffer = BytesIO()
-    wb.save(buffer)
-    buffer.seek(0)
-    
-    filename = f"expenses_{year}_{month:02d}.xlsx"
-    return send_file(buffer, mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    job_id, status = submit_report_job(
+        current_app._get_current_object(), current_user.user_id,
+        report_type, start, end, get_data_version(current_user.user_id)
+    )
+    return jsonify(job_response(job_id, status)), 200 if status == 'done' else 202
+
+@reports_bp.route('/jobs/<job_id>')
+@login_required
+def job_status(job_id):
+    """Report job status as JSON."""
+    get_own_job(job_id)
+    status = get_job_status(current_app.config, job_id)
+    if status is None:
+        abort(404)
+    return jsonify(job_response(job_id, status))
+
+@reports_bp.route('/jobs/<job_id>/download')
+@login_required
+def download_job(job_id):
+    """Download a finished report job."""
+    _, report_type, start, end = get_own_job(job_id)
+    if get_job_status(current_app.config, job_id) != 'done':
+        abort(404)
+    _, filename = describe_report(report_type, start, end)
+    return send_file(artifact_path(current_app.config, job_id),
+                     mimetype=REPORT_TYPES[report_type]['mimetype'],
                      as_attachment=True, download_name=filename)
@@ -0,0 +1,3 @@
+"""
+Service layer - Data access and business logic shared by several routes.
+"""
@@ -0,0 +1,204 @@
+"""
+Anomaly service - Unusual category spending and unusually large expenses.
+Per-category monthly totals come from the expense rollups in one query and
+form a category x month matrix; each category's baseline is the median and
+MAD (median absolute deviation) of its active months, and this month's
+spend so far is scored against the pro-rated baseline. A category that had
+spent as much by the same day last year (daily totals, one grouped query)
+is treated as seasonal, not unusual.
+Single expenses from the last ANOMALY_RECENT_DAYS days are scored against
+the median/MAD of earlier expenses in their category (at most the latest
+ANOMALY_BASELINE_EXPENSES), computed for all categories at once from sorted
+arrays. Requires NumPy (see forecast).
+"""
+
+import calendar
+from datetime import date, timedelta
+from flask import current_app
+from sqlalchemy import func, select
+from app import db
+from app.models.expense import Expense
+from app.models.rollup import ExpenseRollup
+from app.services import refdata
+from app.services.rollups import month_span
+from app.utils.money import from_minor, to_minor
+
+# Scale factor that makes the MAD comparable to a standard deviation
+MAD_SCALE = 1.4826
+# The spread never counts as smaller than this share of the median
+MIN_SPREAD_RATIO = 0.1
+# Spend must also exceed last year's spend by the same day by this factor
+SEASONAL_FACTOR = 1.25
+
+def _month_number(year, month):
+    return year * 12 + month - 1
+
+def _group_medians(groups, values):
+    """
+    Median of `values` per group id for sorted arrays; returns (group ids,
+    medians, counts). `groups` and `values` must be sorted by (group, value).
+    """
+    import numpy as np
+    
+    ids, starts, counts = np.unique(groups, return_index=True, return_counts=True)
+    lower = values[starts + (counts - 1) // 2]
+    upper = values[starts + counts // 2]
+    return ids, (lower + upper) / 2, counts
+
+def _same_day_last_year(today):
+    try:
+        return today.replace(year=today.year - 1)
+    except ValueError:  # 29 February
+        return today.replace(year=today.year - 1, day=28)
+
+def _last_year_to_date(user_id, today):
+    """{category_id: paise} spent from the 1st to today's date of the same month last year."""
+    end = _same_day_last_year(today)
+    return dict(db.session.execute(select(
+        Expense.category_id, func.sum(Expense.amount_minor)
+    ).where(
+        Expense.user_id == user_id,
+        Expense.expense_date >= end.replace(day=1),
+        Expense.expense_date <= end
+    ).group_by(Expense.category_id)).all())
+
+def category_anomalies(user_id, today, config):
+    """Categories whose spend this month so far is unusually high."""
+    import numpy as np
+    
+    current = _month_number(today.year, today.month)
+    first = current - config['ANOMALY_HISTORY_MONTHS']
+    rows = db.session.execute(select(
+        ExpenseRollup.category_id, ExpenseRollup.year, ExpenseRollup.month, ExpenseRollup.total_minor
+    ).where(
+        ExpenseRollup.user_id == user_id,
+        month_span(ExpenseRollup, (first // 12, first % 12 + 1), (today.year, today.month)),
+        ExpenseRollup.count > 0
+    )).all()
+    if not rows:
+        return []
+    
+    category_ids, years, months, totals = (np.array(column, dtype=np.int64) for column in zip(*rows))
+    categories, category_index = np.unique(category_ids, return_inverse=True)
+    matrix = np.zeros((len(categories), current - first + 1))
+    matrix[category_index, years * 12 + months - 1 - first] = totals
+    
+    history, spent = matrix[:, :-1], matrix[:, -1]
+    # Months before a category's first spend are not part of its baseline
+    active = np.cumsum(history > 0, axis=1) > 0
+    baseline = np.where(active, history, np.nan)
+    samples = active.sum(axis=1)
+    usable = samples >= config['ANOMALY_MIN_HISTORY']
+    if not usable.any():
+        return []
+    
+    baseline, spent, categories = baseline[usable], spent[usable], categories[usable]
+    min_amount = to_minor(config['ANOMALY_MIN_AMOUNT'])
+    median = np.nanmedian(baseline, axis=1)
+    spread = MAD_SCALE * np.nanmedian(np.abs(baseline - median[:, None]), axis=1)
+    spread = np.maximum(spread, MIN_SPREAD_RATIO * median)
+    
+    # Compare month-to-date spend with the same share of a typical month
+    elapsed = today.day / calendar.monthrange(today.year, today.month)[1]
+    expected = median * elapsed
+    scores = (spent - expected) / np.maximum(spread * elapsed, min_amount)
+    last_year_spend = _last_year_to_date(user_id, today)
+    last_year = np.array([last_year_spend.get(int(c), 0) for c in categories], dtype=np.float64)
+    flagged = (
+        (scores >= config['ANOMALY_THRESHOLD'])
+        & (spent - expected >= min_amount)
+        & (spent > last_year * SEASONAL_FACTOR)
+    )
+    
+    names = {c.category_id: c.category_name for c in refdata.get_categories(user_id)}
+    order = np.argsort(-scores[flagged])
+    return [
+        {
+            'category_id': int(category_id),
+            'category': names.get(int(category_id), ''),
+            'spent': from_minor(int(amount)),
+            'typical': from_minor(int(round(typical))),
+            'last_year': from_minor(int(round(previous))) if previous else None,
+            'score': round(float(score), 1),
+        }
+        for category_id, amount, typical, previous, score in zip(
+            categories[flagged][order], spent[flagged][order], expected[flagged][order],
+            last_year[flagged][order], scores[flagged][order]
+        )
+    ][:config['ANOMALY_MAX_RESULTS']]
+
+def expense_anomalies(user_id, today, config):
+    """Recent single expenses far above what is usual for their category."""
+    import numpy as np
+    
+    recent_start = today - timedelta(days=config['ANOMALY_RECENT_DAYS'] - 1)
+    history_start = date(today.year - config['ANOMALY_HISTORY_MONTHS'] // 12, today.month, 1)
+    # The baseline is the most recent earlier expenses, walking the (user, date) index backwards
+    rows = db.session.execute(select(Expense.category_id, Expense.amount_minor).where(
+        Expense.user_id == user_id,
+        Expense.expense_date >= history_start,
+        Expense.expense_date < recent_start
+    ).order_by(Expense.expense_date.desc()).limit(config['ANOMALY_BASELINE_EXPENSES'])).all()
+    if not rows:
+        return []
+    
+    groups, values = (np.array(column, dtype=np.int64) for column in zip(*rows))
+    order = np.lexsort((values, groups))
+    groups, values = groups[order], values[order]
+    ids, medians, counts = _group_medians(groups, values)
+    deviations = np.abs(values - medians[np.searchsorted(ids, groups)])
+    order = np.lexsort((deviations, groups))
+    _, mads, _ = _group_medians(groups[order], deviations[order])
+    min_amount = to_minor(config['ANOMALY_MIN_AMOUNT'])
+    spreads = np.maximum(MAD_SCALE * mads, np.maximum(MIN_SPREAD_RATIO * medians, min_amount))
+    
+    candidates = db.session.execute(select(
+        Expense.expense_id, Expense.category_id, Expense.expense_date, Expense.amount_minor
+    ).where(
+        Expense.user_id == user_id,
+        Expense.expense_date >= recent_start,
+        Expense.expense_date <= today
+    )).all()
+    if not candidates:
+        return []
+    
+    expense_ids, category_ids, dates, amounts = zip(*candidates)
+    category_ids = np.array(category_ids, dtype=np.int64)
+    amounts = np.array(amounts, dtype=np.int64)
+    slot = np.minimum(np.searchsorted(ids, category_ids), len(ids) - 1)
+    known = (ids[slot] == category_ids) & (counts[slot] >= config['ANOMALY_MIN_EXPENSES'])
+    scores = np.where(known, (amounts - medians[slot]) / spreads[slot], 0)
+    flagged = np.flatnonzero(
+        known
+        & (scores >= config['ANOMALY_THRESHOLD'])
+        & (amounts - medians[slot] >= min_amount)
+    )
+    
+    names = {c.category_id: c.category_name for c in refdata.get_categories(user_id)}
+    flagged = flagged[np.argsort(-scores[flagged])][:config['ANOMALY_MAX_RESULTS']]
+    return [
+        {
+            'expense_id': expense_ids[i],
+            'category_id': int(category_ids[i]),
+            'category': names.get(int(category_ids[i]), ''),
+            'date': dates[i].isoformat(),
+            'amount': from_minor(int(amounts[i])),
+            'typical': from_minor(int(round(medians[slot[i]]))),
+            'score': round(float(scores[i]), 1),
+        }
+        for i in flagged
+    ]
+
+def detect_anomalies(user_id, today=None):
+    """
+    Return {'month', 'categories', 'expenses'} for a user: unusual category
+    totals this month and unusually large recent expenses, highest score first.
+    Scores are robust z-scores (distance from the median in MAD-based spreads).
+    """
+    config = current_app.config
+    today = today or date.today()
+    return {
+        'month': today.strftime('%Y-%m'),
+        'categories': category_anomalies(user_id, today, config),
+        'expenses': expense_anomalies(user_id, today, config),
+    }
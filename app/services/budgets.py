@@ -0,0 +1,43 @@
+"""
+Budget status service - Budget vs actual spend for any set of budgets.
+Spend comes from one grouped join of the budgets with the monthly expense
+rollups, so the cost does not grow with the number of budgets shown.
+Arithmetic is done in paise; amounts are returned in rupees for display.
+"""
+
+from sqlalchemy import and_, func
+from app import db
+from app.models.budget import Budget
+from app.models.rollup import ExpenseRollup
+from app.utils.money import from_minor
+
+def get_budget_status(budgets):
+    """
+    Return spent, remaining and percent-used for each budget, in input order.
+    Each item is a dict: {'budget', 'spent', 'remaining', 'percent_used'}.
+    """
+    if not budgets:
+        return []
+    
+    rows = db.session.query(
+        Budget.budget_id,
+        func.coalesce(func.sum(ExpenseRollup.total_minor), 0)
+    ).outerjoin(ExpenseRollup, and_(
+        ExpenseRollup.user_id == Budget.user_id,
+        ExpenseRollup.year == Budget.year,
+        ExpenseRollup.month == Budget.month
+    )).filter(
+        Budget.budget_id.in_([b.budget_id for b in budgets])
+    ).group_by(Budget.budget_id).all()
+    spent_by_budget = dict(rows)
+    
+    status = []
+    for b in budgets:
+        spent = int(spent_by_budget.get(b.budget_id, 0))
+        status.append({
+            'budget': b,
+            'spent': from_minor(spent),
+            'remaining': from_minor(b.amount_minor - spent),
+            'percent_used': (spent / b.amount_minor * 100) if b.amount_minor > 0 else 0
+        })
+    return status
@@ -0,0 +1,237 @@
+"""
+Result cache - Per-user cache for dashboard data, keyed by a data version.
+Every write bumps users.data_version, so cached results are never served
+after a change and stale entries simply age out of the backend.
+"""
+
+import functools
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from flask import current_app, g
+from flask_login import current_user
+from sqlalchemy import select, update
+from app import db
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+class NullBackend:
+    """Backend that stores nothing - every lookup is a miss."""
+    
+    def get(self, key):
+        return None
+    
+    def set(self, key, value, ttl=None):
+        pass
+    
+    def delete(self, key):
+        pass
+    
+    def clear(self):
+        pass
+
+class MemoryBackend:
+    """In-process LRU cache with per-entry TTL and a maximum entry count."""
+    
+    def __init__(self, max_entries=1000, default_ttl=300):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (ttl or self.default_ttl)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+class SQLiteBackend:
+    """
+    Disk cache in a local SQLite file, shared by all workers on the host.
+    Values are stored as JSON; expired and surplus entries are pruned
+    every `prune_interval` writes.
+    """
+    
+    def __init__(self, path, max_entries=10000, default_ttl=300, prune_interval=100):
+        self.path = path
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.prune_interval = prune_interval
+        self._local = threading.local()
+        self._writes = 0
+        self._connect().execute(
+            'CREATE TABLE IF NOT EXISTS cache_entries '
+            '(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)'
+        )
+    
+    def _connect(self):
+        """Return this thread's connection, reopening it after a fork."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+    
+    def get(self, key):
+        try:
+            row = self._connect().execute(
+                'SELECT value FROM cache_entries WHERE key = ? AND expires_at > ?',
+                (key, time.time())
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning('Cache read failed: %s', e)
+            return None
+        return json.loads(row[0]) if row else None
+    
+    def set(self, key, value, ttl=None):
+        expires_at = time.time() + (ttl or self.default_ttl)
+        try:
+            conn = self._connect()
+            conn.execute(
+                'INSERT OR REPLACE INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)',
+                (key, json.dumps(value), expires_at)
+            )
+            self._writes += 1
+            if self._writes % self.prune_interval == 0:
+                self._prune(conn)
+        except sqlite3.Error as e:
+            logger.warning('Cache write failed: %s', e)
+    
+    def delete(self, key):
+        try:
+            self._connect().execute('DELETE FROM cache_entries WHERE key = ?', (key,))
+        except sqlite3.Error as e:
+            logger.warning('Cache delete failed: %s', e)
+    
+    def _prune(self, conn):
+        """Drop expired entries, then the soonest-expiring ones over the limit."""
+        conn.execute('DELETE FROM cache_entries WHERE expires_at <= ?', (time.time(),))
+        conn.execute(
+            'DELETE FROM cache_entries WHERE key IN (SELECT key FROM cache_entries '
+            'ORDER BY expires_at DESC LIMIT -1 OFFSET ?)',
+            (self.max_entries,)
+        )
+    
+    def clear(self):
+        self._connect().execute('DELETE FROM cache_entries')
+
+def create_backend(config):
+    """Build the backend named by CACHE_BACKEND ('memory', 'sqlite' or 'null')."""
+    name = config.get('CACHE_BACKEND', 'memory')
+    ttl = config.get('CACHE_DEFAULT_TTL', 300)
+    max_entries = config.get('CACHE_MAX_ENTRIES', 1000)
+    if name == 'memory':
+        return MemoryBackend(max_entries=max_entries, default_ttl=ttl)
+    if name == 'sqlite':
+        return SQLiteBackend(config['CACHE_SQLITE_PATH'], max_entries=max_entries, default_ttl=ttl)
+    if name == 'null':
+        return NullBackend()
+    raise ValueError(f'Unknown CACHE_BACKEND: {name}')
+
+def init_app(app):
+    """Create the configured backend and attach it to the app."""
+    app.extensions['result_cache'] = create_backend(app.config)
+
+def get_backend():
+    """Return the current app's cache backend."""
+    return current_app.extensions['result_cache']
+
+def get_data_version(user_id):
+    """
+    A user's current data version, read once per request. It is never taken
+    from a cached user row, so other workers' writes are seen immediately.
+    """
+    versions = g.setdefault('data_versions', {})
+    if user_id not in versions:
+        versions[user_id] = db.session.execute(
+            select(User.data_version).where(User.user_id == user_id)
+        ).scalar() or 0
+    return versions[user_id]
+
+def bump_data_version(user_id):
+    """
+    Mark a user's data as changed, invalidating all of their cached results.
+    Runs in the caller's transaction so the bump commits with the write.
+    """
+    db.session.execute(
+        update(User).where(User.user_id == user_id).values(
+            data_version=User.data_version + 1
+        ).execution_options(synchronize_session=False)
+    )
+    g.pop('data_versions', None)
+
+def bump_data_versions(user_ids):
+    """bump_data_version() for many users with one statement."""
+    db.session.execute(
+        update(User).where(User.user_id.in_(list(user_ids))).values(
+            data_version=User.data_version + 1
+        ).execution_options(synchronize_session=False)
+    )
+    g.pop('data_versions', None)
+
+def user_cache_key(name, *args):
+    """Key for the current user's data at their current data version."""
+    parts = [name, str(current_user.user_id), str(get_data_version(current_user.user_id)), date.today().isoformat()]
+    parts += [repr(a) for a in args]
+    return ':'.join(parts)
+
+def user_etag(name, *args):
+    """
+    Strong ETag for a response built from the current user's data. It changes
+    with every write (data version) and each day, like user_cache_key().
+    """
+    return hashlib.sha256(user_cache_key(name, *args).encode()).hexdigest()[:32]
+
+def get_or_set(key, compute, ttl=None):
+    """Return the cached value for key, computing and storing it on a miss."""
+    backend = get_backend()
+    value = backend.get(key)
+    if value is None:
+        value = compute()
+        backend.set(key, value, ttl)
+    return value
+
+def cached_per_user(name, ttl=None):
+    """
+    Decorator caching a current-user helper's JSON-serialisable result.
+    The key includes today's date because results depend on the current month.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = user_cache_key(name, *args, *sorted(kwargs.items()))
+            return get_or_set(key, lambda: func(*args, **kwargs), ttl)
+        return wrapper
+    return decorator
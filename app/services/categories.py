@@ -0,0 +1,93 @@
+"""
+Category service - Reassign expenses between categories and merge categories.
+Expenses are moved with set-based UPDATEs of at most
+CATEGORY_MOVE_BATCH_SIZE rows. Each batch commits together with its rollup
+deltas and a data version bump, so rollups always match the base table and
+the SQLite write lock is released between batches instead of being held
+for the whole category.
+"""
+
+from collections import defaultdict
+from flask import current_app
+from sqlalchemy import delete, extract, func, select, update
+from app import db
+from app.models.category import Category
+from app.models.expense import Expense
+from app.models.recurring import RecurringRule
+from app.services import refdata, rollups
+from app.services.cache import bump_data_version
+
+def _move_batch(user_id, expense_ids, target_id):
+    """Move one batch of expenses to target_id and shift their rollup totals."""
+    year = extract('year', Expense.expense_date)
+    month = extract('month', Expense.expense_date)
+    totals = db.session.execute(select(
+        year, month, Expense.category_id, func.sum(Expense.amount_minor), func.count()
+    ).where(Expense.expense_id.in_(expense_ids)).group_by(year, month, Expense.category_id)).all()
+    
+    deltas = defaultdict(lambda: (0, 0))
+    for row_year, row_month, category_id, amount_minor, count in totals:
+        source = (user_id, int(row_year), int(row_month), category_id)
+        target = (user_id, int(row_year), int(row_month), target_id)
+        deltas[source] = (deltas[source][0] - amount_minor, deltas[source][1] - count)
+        deltas[target] = (deltas[target][0] + amount_minor, deltas[target][1] + count)
+    
+    db.session.execute(
+        update(Expense).where(Expense.expense_id.in_(expense_ids)).values(category_id=target_id)
+        .execution_options(synchronize_session=False)
+    )
+    rollups.apply_expense_deltas(dict(deltas))
+
+def reassign_expenses(user_id, source_ids, target_id, batch_size=None):
+    """
+    Move every expense of the user's source categories to target_id and
+    return how many were moved. Commits once per batch; the caller checks
+    that the user owns all of the categories.
+    """
+    batch_size = batch_size or current_app.config['CATEGORY_MOVE_BATCH_SIZE']
+    source_ids = [category_id for category_id in source_ids if category_id != target_id]
+    if not source_ids:
+        return 0
+    
+    pending = select(Expense.expense_id).where(
+        Expense.user_id == user_id, Expense.category_id.in_(source_ids)
+    ).limit(batch_size)
+    moved = 0
+    while True:
+        expense_ids = db.session.execute(pending).scalars().all()
+        if not expense_ids:
+            return moved
+        _move_batch(user_id, expense_ids, target_id)
+        bump_data_version(user_id)
+        db.session.commit()
+        moved += len(expense_ids)
+
+def merge_categories(user_id, source_ids, target_id, batch_size=None):
+    """
+    Reassign the expenses (and recurring rules) of the source categories to
+    target_id, then delete the now empty source categories. Returns the
+    number of expenses moved.
+    """
+    source_ids = [category_id for category_id in source_ids if category_id != target_id]
+    moved = reassign_expenses(user_id, source_ids, target_id, batch_size)
+    db.session.execute(
+        update(RecurringRule).where(
+            RecurringRule.user_id == user_id, RecurringRule.category_id.in_(source_ids)
+        ).values(category_id=target_id).execution_options(synchronize_session=False)
+    )
+    # Expenses added to a source category since the last batch move with the delete
+    stragglers = db.session.execute(select(Expense.expense_id).where(
+        Expense.user_id == user_id, Expense.category_id.in_(source_ids)
+    )).scalars().all()
+    if stragglers:
+        _move_batch(user_id, stragglers, target_id)
+        moved += len(stragglers)
+    for category_id in source_ids:
+        rollups.remove_category(category_id)
+    db.session.execute(delete(Category).where(
+        Category.user_id == user_id, Category.category_id.in_(source_ids)
+    ))
+    bump_data_version(user_id)
+    db.session.commit()
+    refdata.invalidate_categories(user_id)
+    return moved
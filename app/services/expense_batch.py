@@ -0,0 +1,167 @@
+"""
+Expense batch service - Applies many create/update/delete operations at once.
+Category ownership comes from the reference-data cache and the targeted
+expenses are loaded with one IN query; the writes go out as bulk statements
+and everything commits together, with the rollups and data version updated
+in the same transaction.
+"""
+
+from collections import defaultdict
+from datetime import datetime
+from sqlalchemy import bindparam, delete, select
+from app import db
+from app.models.expense import Expense
+from app.services import refdata, rollups
+from app.services.cache import bump_data_version
+from app.utils.money import AmountTooLarge, to_minor
+
+OPERATIONS = ('create', 'update', 'delete')
+FIELDS = ('category_id', 'amount_minor', 'expense_date', 'description')
+
+class BatchItemError(ValueError):
+    """An operation in the batch that cannot be applied."""
+
+def _parse_fields(op, partial):
+    """
+    Validate the expense fields of a create/update operation.
+    Updates may omit fields, which then keep their stored value.
+    """
+    fields = {}
+    if 'amount' in op or not partial:
+        try:
+            amount_minor = to_minor(op.get('amount'))
+        except AmountTooLarge:
+            raise BatchItemError('amount is too large')
+        except (TypeError, ValueError):
+            raise BatchItemError('amount must be a number')
+        if amount_minor <= 0:
+            raise BatchItemError('amount must be positive')
+        fields['amount_minor'] = amount_minor
+    if 'category_id' in op or not partial:
+        try:
+            fields['category_id'] = int(op.get('category_id'))
+        except (TypeError, ValueError):
+            raise BatchItemError('category_id must be an integer')
+    if 'date' in op or not partial:
+        try:
+            fields['expense_date'] = datetime.strptime(str(op.get('date')), '%Y-%m-%d').date()
+        except ValueError:
+            raise BatchItemError('date must be YYYY-MM-DD')
+    if 'description' in op or not partial:
+        fields['description'] = str(op.get('description') or '').strip()[:200]
+    return fields
+
+def _parse_operation(op, touched):
+    """Return (kind, expense_id, fields) for one raw operation dict."""
+    if not isinstance(op, dict):
+        raise BatchItemError('operation must be an object')
+    kind = op.get('op')
+    if kind not in OPERATIONS:
+        raise BatchItemError(f'op must be one of {", ".join(OPERATIONS)}')
+    
+    expense_id = None
+    if kind != 'create':
+        try:
+            expense_id = int(op.get('id'))
+        except (TypeError, ValueError):
+            raise BatchItemError('id must be an integer')
+        if expense_id in touched:
+            raise BatchItemError(f'expense {expense_id} appears more than once in this batch')
+        touched.add(expense_id)
+    
+    fields = _parse_fields(op, partial=kind == 'update') if kind != 'delete' else {}
+    return kind, expense_id, fields
+
+def _result(index, op, status, **extra):
+    result = {'index': index, 'op': op.get('op') if isinstance(op, dict) else None, 'status': status}
+    if isinstance(op, dict) and 'client_id' in op:
+        result['client_id'] = op['client_id']
+    result.update(extra)
+    return result
+
+def apply_expense_batch(user_id, operations):
+    """
+    Apply a list of operations for one user:
+    {"op": "create", "amount", "category_id", "date", "description"},
+    {"op": "update", "id", ...fields to change}, {"op": "delete", "id"}.
+    Invalid operations are reported and skipped; the rest commit together.
+    Returns one result dict per operation, in request order.
+    """
+    results = [None] * len(operations)
+    parsed = []
+    touched = set()
+    for index, op in enumerate(operations):
+        try:
+            parsed.append((index, op) + _parse_operation(op, touched))
+        except BatchItemError as e:
+            results[index] = _result(index, op, 'error', error=str(e))
+    
+    # Owned categories come from the reference-data cache; targeted expenses take one query
+    owned = refdata.get_category_ids(user_id)
+    
+    expense_ids = [expense_id for _, _, _, expense_id, _ in parsed if expense_id is not None]
+    current = {
+        row.expense_id: row
+        for row in db.session.execute(select(Expense.expense_id, *[Expense.__table__.c[f] for f in FIELDS]).where(
+            Expense.user_id == user_id,
+            Expense.expense_id.in_(expense_ids)
+        ))
+    } if expense_ids else {}
+    
+    creates, updates, deletes = [], [], []
+    deltas = defaultdict(lambda: [0, 0])
+    
+    def track(values, sign):
+        delta = deltas[(user_id, values['expense_date'].year, values['expense_date'].month, values['category_id'])]
+        delta[0] += sign * values['amount_minor']
+        delta[1] += sign
+    
+    for index, op, kind, expense_id, fields in parsed:
+        if 'category_id' in fields and fields['category_id'] not in owned:
+            results[index] = _result(index, op, 'error', error='invalid category')
+            continue
+        if kind != 'create' and expense_id not in current:
+            results[index] = _result(index, op, 'error', error='expense not found')
+            continue
+        
+        if kind == 'create':
+            creates.append((index, op, dict(fields, user_id=user_id)))
+            track(fields, 1)
+        elif kind == 'update':
+            old = current[expense_id]._asdict()
+            new = {f: fields.get(f, old[f]) for f in FIELDS}
+            updates.append(dict(new, k_expense_id=expense_id))
+            track(old, -1)
+            track(new, 1)
+            results[index] = _result(index, op, 'updated', id=expense_id)
+        else:
+            deletes.append(expense_id)
+            track(current[expense_id]._asdict(), -1)
+            results[index] = _result(index, op, 'deleted', id=expense_id)
+    
+    if creates:
+        # One multi-row INSERT; ids come back in parameter order, so they line
+        # up with the operations that created them
+        new_ids = db.session.execute(
+            Expense.__table__.insert().returning(Expense.expense_id, sort_by_parameter_order=True),
+            [values for _, _, values in creates]
+        ).scalars().all()
+        for (index, op, _), expense_id in zip(creates, new_ids):
+            results[index] = _result(index, op, 'created', id=expense_id)
+    if updates:
+        table = Expense.__table__
+        db.session.execute(
+            table.update().where(table.c.expense_id == bindparam('k_expense_id')),
+            updates
+        )
+    if deletes:
+        db.session.execute(delete(Expense).where(
+            Expense.user_id == user_id,
+            Expense.expense_id.in_(deletes)
+        ))
+    
+    if creates or updates or deletes:
+        rollups.apply_expense_deltas(deltas)
+        bump_data_version(user_id)
+        db.session.commit()
+    return results
@@ -0,0 +1,59 @@
+"""
+Export service - Streams expense rows into report files.
+Rows are fetched as plain column tuples in chunks and written straight to
+the output, so memory stays flat no matter how many rows are exported.
+"""
+
+from sqlalchemy import select
+from app import db
+from app.models.category import Category
+from app.models.expense import Expense
+from app.utils.money import from_minor
+
+# Rows fetched from the database per round trip while streaming
+FETCH_CHUNK_SIZE = 1000
+
+def iter_expense_rows(user_id, start, end, chunk_size=FETCH_CHUNK_SIZE):
+    """
+    Yield (expense_date, category_name, amount_minor, description) tuples for
+    expenses dated in [start, end), oldest first.
+    """
+    stmt = select(
+        Expense.expense_date,
+        Category.category_name,
+        Expense.amount_minor,
+        Expense.description
+    ).join(Category, Category.category_id == Expense.category_id).where(
+        Expense.user_id == user_id,
+        Expense.expense_date >= start,
+        Expense.expense_date < end
+    ).order_by(Expense.expense_date, Expense.expense_id).execution_options(yield_per=chunk_size)
+    
+    yield from db.session.execute(stmt)
+
+def write_expenses_xlsx(fileobj, user_id, start, end, sheet_title):
+    """
+    Write an expense sheet for [start, end) to fileobj using a write-only
+    workbook, which streams rows to disk instead of keeping cell objects.
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font, PatternFill
+    
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(sheet_title)
+    
+    header_font = Font(bold=True)
+    header_fill = PatternFill(start_color='DDDDDD', end_color='DDDDDD', fill_type='solid')
+    headers = []
+    for title in ['Date', 'Category', 'Amount', 'Description']:
+        cell = WriteOnlyCell(ws, value=title)
+        cell.font = header_font
+        cell.fill = header_fill
+        headers.append(cell)
+    ws.append(headers)
+    
+    for expense_date, category_name, amount_minor, description in iter_expense_rows(user_id, start, end):
+        ws.append([expense_date.strftime('%Y-%m-%d'), category_name, from_minor(amount_minor), description or ''])
+    
+    wb.save(fileobj)
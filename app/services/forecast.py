@@ -0,0 +1,163 @@
+"""
+Forecast service - Month-end spend projections from daily totals.
+A user's daily expense and income totals are loaded with one grouped query
+into dense NumPy arrays (one slot per day, in paise); rolling averages,
+weekday spending profiles, the month-end projection and the budget
+exhaustion date are then whole-array operations with no per-row loops.
+NumPy is optional: without it forecast_available() is False and callers
+leave the forecast out.
+"""
+
+import calendar
+from datetime import date, timedelta
+from flask import current_app
+from sqlalchemy import func, literal, select, union_all
+from app import db
+from app.models.budget import Budget
+from app.models.expense import Expense
+from app.models.income import Income
+from app.utils.money import MINOR_PER_UNIT, from_minor
+
+# Full previous months whose median income stands in for income still to come
+INCOME_BASELINE_MONTHS = 6
+
+def forecast_available():
+    """True when NumPy is installed."""
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def load_daily_totals(user_id, start, end):
+    """
+    Return (expense, income) int64 arrays of daily totals in paise for the
+    half-open date range [start, end); index 0 is `start`.
+    """
+    import numpy as np
+    
+    expense_days = select(
+        literal(0).label('kind'), Expense.expense_date.label('day'), func.sum(Expense.amount_minor)
+    ).where(
+        Expense.user_id == user_id, Expense.expense_date >= start, Expense.expense_date < end
+    ).group_by(Expense.expense_date)
+    income_days = select(
+        literal(1), Income.income_date, func.sum(Income.amount_minor)
+    ).where(
+        Income.user_id == user_id, Income.income_date >= start, Income.income_date < end
+    ).group_by(Income.income_date)
+    rows = db.session.execute(union_all(expense_days, income_days)).all()
+    
+    days = (end - start).days
+    expense = np.zeros(days, dtype=np.int64)
+    income = np.zeros(days, dtype=np.int64)
+    if rows:
+        kinds, dates, totals = zip(*rows)
+        kinds = np.array(kinds, dtype=np.int8)
+        offsets = (np.array(dates, dtype='datetime64[D]') - np.datetime64(start, 'D')).astype(np.int64)
+        totals = np.array(totals, dtype=np.int64)
+        expense[offsets[kinds == 0]] = totals[kinds == 0]
+        income[offsets[kinds == 1]] = totals[kinds == 1]
+    return expense, income
+
+def rolling_mean(values, window):
+    """Trailing mean over `window` days for every day (shorter at the start)."""
+    import numpy as np
+    
+    sums = np.cumsum(values, dtype=np.float64)
+    sums[window:] = sums[window:] - sums[:-window]
+    return sums / np.minimum(np.arange(1, len(values) + 1), window)
+
+def weekday_profile(values, first_weekday):
+    """Mean value per weekday (Monday=0) of a daily series starting on first_weekday."""
+    import numpy as np
+    
+    weekdays = (first_weekday + np.arange(len(values))) % 7
+    counts = np.bincount(weekdays, minlength=7)
+    sums = np.bincount(weekdays, weights=values, minlength=7)
+    return np.divide(sums, counts, out=np.zeros(7), where=counts > 0)
+
+def monthly_totals(values, start):
+    """Sum a daily series starting at `start` per calendar month, oldest first."""
+    import numpy as np
+    
+    months = (np.datetime64(start, 'D') + np.arange(len(values))).astype('datetime64[M]')
+    boundaries = np.concatenate(([0], np.flatnonzero(months[1:] != months[:-1]) + 1))
+    return np.add.reduceat(values, boundaries)
+
+def build_forecast(user_id, today=None, include_series=False):
+    """
+    Project the current month for a user. Returns a JSON-serialisable dict
+    with amounts in rupees: spent so far, projected month-end expense, income
+    and savings, 7/30-day daily averages, the budget and the date it runs out
+    (actual if already exceeded, projected otherwise, None if it lasts the month).
+    With include_series the daily expenses and rolling averages are added.
+    """
+    import numpy as np
+    
+    config = current_app.config
+    today = today or date.today()
+    month_start = today.replace(day=1)
+    month_days = calendar.monthrange(today.year, today.month)[1]
+    start = min(month_start, today - timedelta(days=config['FORECAST_HISTORY_DAYS'] - 1))
+    expense, income = load_daily_totals(user_id, start, today + timedelta(days=1))
+    
+    first = (month_start - start).days
+    spent = int(expense[first:].sum())
+    received = int(income[first:].sum())
+    
+    # Expected spend for each remaining day from the weekday profile of recent full days
+    profile_start = max(0, len(expense) - 1 - config['FORECAST_PROFILE_DAYS'])
+    recent = expense[profile_start:-1]
+    if recent.any():
+        profile = weekday_profile(recent, (start + timedelta(days=profile_start)).weekday())
+    else:
+        profile = np.full(7, spent / today.day)
+    remaining_days = month_days - today.day
+    expected = profile[(today.weekday() + 1 + np.arange(remaining_days)) % 7]
+    projected_expense = spent + int(round(expected.sum()))
+    
+    # Income still to come: the typical month, unless this month already received more
+    previous_months = monthly_totals(income[:first], start)[1 if start.day > 1 else 0:] if first else []
+    typical_income = (
+        int(np.median(previous_months[-INCOME_BASELINE_MONTHS:])) if len(previous_months) else 0
+    )
+    projected_income = max(received, typical_income)
+    
+    budget = db.session.execute(select(Budget.amount_minor).where(
+        Budget.user_id == user_id, Budget.year == today.year, Budget.month == today.month
+    )).scalar()
+    exhausted_on = None
+    if budget is not None:
+        if spent >= budget:
+            day = int(np.searchsorted(np.cumsum(expense[first:]), budget))
+            exhausted_on = month_start + timedelta(days=day)
+        else:
+            day = int(np.searchsorted(np.cumsum(expected), budget - spent))
+            if day < remaining_days:
+                exhausted_on = today + timedelta(days=day + 1)
+    
+    rolling_7 = rolling_mean(expense, 7)
+    rolling_30 = rolling_mean(expense, 30)
+    forecast = {
+        'as_of': today.isoformat(),
+        'month': month_start.strftime('%Y-%m'),
+        'spent': from_minor(spent),
+        'projected_expense': from_minor(projected_expense),
+        'projected_income': from_minor(projected_income),
+        'projected_savings': from_minor(projected_income - projected_expense),
+        'daily_average_7': round(float(rolling_7[-1]) / MINOR_PER_UNIT, 2),
+        'daily_average_30': round(float(rolling_30[-1]) / MINOR_PER_UNIT, 2),
+        'budget': from_minor(budget) if budget is not None else None,
+        'budget_exhausted_on': exhausted_on.isoformat() if exhausted_on else None,
+    }
+    if include_series:
+        days = min(config['FORECAST_SERIES_DAYS'], len(expense))
+        dates = np.datetime64(today, 'D') - np.arange(days - 1, -1, -1)
+        forecast['series'] = {
+            'dates': dates.astype(str).tolist(),
+            'expense': (expense[-days:] / MINOR_PER_UNIT).tolist(),
+            'rolling_7': np.round(rolling_7[-days:] / MINOR_PER_UNIT, 2).tolist(),
+            'rolling_30': np.round(rolling_30[-days:] / MINOR_PER_UNIT, 2).tolist(),
+        }
+    return forecast
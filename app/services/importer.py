@@ -0,0 +1,264 @@
+"""
+CSV import service - Bulk loads expenses and income from CSV files.
+Rows are stream-parsed and inserted in executemany batches, one bounded
+transaction per batch, with rollups and the data version updated alongside.
+Re-importing a file skips rows already imported via a row fingerprint.
+A file that cannot be decoded or parsed part-way stops the import; the
+rows before that point are kept and the result says where it stopped.
+"""
+
+import csv
+import hashlib
+import io
+from collections import Counter, defaultdict
+from datetime import date, datetime
+from sqlalchemy import select
+from app import db
+from app.models.category import Category
+from app.models.expense import Expense
+from app.models.income import Income
+from app.services import refdata, rollups
+from app.services.cache import bump_data_version
+from app.utils.money import from_minor, to_minor
+
+IMPORT_BATCH_SIZE = 5000
+MAX_REPORTED_ERRORS = 50
+DATE_FORMATS = ('%Y-%m-%d', '%d-%m-%Y', '%d/%m/%Y')
+DEFAULT_CATEGORY = 'Uncategorized'
+
+# Encodings offered on the import pages; utf-8-sig also accepts plain UTF-8
+IMPORT_ENCODINGS = {
+    'utf-8-sig': 'UTF-8',
+    'cp1252': 'Windows-1252 (Excel, most bank exports)',
+    'latin-1': 'ISO-8859-1 (Latin-1)',
+}
+DEFAULT_ENCODING = 'utf-8-sig'
+
+def _new_result():
+    return {'imported': 0, 'duplicates': 0, 'failed': 0, 'categories_created': 0, 'errors': [], 'stopped': None}
+
+def _add_error(result, line, message):
+    result['failed'] += 1
+    if len(result['errors']) < MAX_REPORTED_ERRORS:
+        result['errors'].append(f'Line {line}: {message}')
+
+def _parse_date(value):
+    value = (value or '').strip()
+    try:
+        # Fast path for ISO dates, the common case for bank exports
+        return date.fromisoformat(value)
+    except ValueError:
+        pass
+    for fmt in DATE_FORMATS[1:]:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f'invalid date "{value}"')
+
+def _parse_amount(value):
+    """Amount in paise; rounded half-up to the paisa."""
+    amount_minor = to_minor(value or '')
+    if amount_minor <= 0:
+        raise ValueError('amount must be positive')
+    return amount_minor
+
+def _stopped_at(reader):
+    # Text is decoded in blocks, so the bad line is at or after the last one read
+    return f'Stopped after line {reader.line_num}' if reader.line_num else 'Could not read the file'
+
+def _read_rows(stream, encoding, result):
+    """
+    Yield (line number, row dict with lower-cased headers) from a binary or
+    text stream. Undecodable bytes or malformed CSV end the rows early and
+    are recorded in result['stopped'].
+    """
+    if isinstance(stream, io.TextIOBase):
+        text = stream
+    else:
+        text = io.TextIOWrapper(stream, encoding=encoding, newline='')
+    reader = csv.DictReader(text)
+    try:
+        if reader.fieldnames:
+            reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+        for row in reader:
+            yield reader.line_num, row
+    except UnicodeDecodeError as e:
+        hint = ' Try importing it as Windows-1252.' if encoding.startswith('utf') else ''
+        result['stopped'] = f'{_stopped_at(reader)}: the file is not valid {e.encoding} ({e.reason}).{hint}'
+    except csv.Error as e:
+        result['stopped'] = f'{_stopped_at(reader)}: {e}.'
+
+def _batches(rows, size):
+    batch = []
+    for item in rows:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _fingerprint(user_id, seen, *fields):
+    """
+    Stable hash of a row's content plus how often that content already
+    appeared in this file, so genuine repeats within one file are kept.
+    """
+    content = '|'.join(str(f) for f in (user_id,) + fields)
+    seen[content] += 1
+    return hashlib.sha1(f'{content}|{seen[content]}'.encode()).hexdigest()
+
+def _existing_fingerprints(model, user_id, fingerprints):
+    return set(db.session.execute(select(model.import_fingerprint).where(
+        model.user_id == user_id,
+        model.import_fingerprint.in_(fingerprints)
+    )).scalars())
+
+def _resolve_categories(user_id, names, category_ids):
+    """
+    Fill category_ids ({lower-case name: id}) for names not seen yet,
+    creating the missing categories with one bulk insert.
+    Returns the number of categories created.
+    """
+    missing = {}
+    for name in names:
+        if name.lower() not in category_ids:
+            missing.setdefault(name.lower(), name)
+    if not missing:
+        return 0
+    
+    db.session.execute(Category.__table__.insert(), [
+        {'user_id': user_id, 'category_name': name} for name in missing.values()
+    ])
+    rows = db.session.execute(select(Category.category_id, Category.category_name).where(
+        Category.user_id == user_id,
+        Category.category_name.in_(list(missing.values()))
+    ))
+    for category_id, name in rows:
+        category_ids[name.lower()] = category_id
+    return len(missing)
+
+def import_expenses_csv(user_id, stream, batch_size=IMPORT_BATCH_SIZE, encoding=DEFAULT_ENCODING):
+    """
+    Import expenses from CSV with columns date, amount, category, description.
+    Unknown categories are created; rows whose fingerprint was already
+    imported are skipped. Returns a summary dict of counts and errors.
+    """
+    result = _new_result()
+    seen = Counter()
+    category_ids = {
+        name.lower(): category_id
+        for category_id, name in db.session.execute(select(
+            Category.category_id, Category.category_name
+        ).where(Category.user_id == user_id))
+    }
+    
+    for batch in _batches(_read_rows(stream, encoding, result), batch_size):
+        parsed = []
+        for line, row in batch:
+            try:
+                category = (row.get('category') or '').strip()[:50] or DEFAULT_CATEGORY
+                description = (row.get('description') or '').strip()[:200]
+                expense_date = _parse_date(row.get('date'))
+                amount = _parse_amount(row.get('amount'))
+            except (ValueError, AttributeError) as e:
+                _add_error(result, line, str(e))
+                continue
+            # Fingerprints hash the rupee value, as they did before amounts were stored in paise
+            fingerprint = _fingerprint(user_id, seen, expense_date, from_minor(amount), category.lower(), description)
+            parsed.append((fingerprint, category, expense_date, amount, description))
+        if not parsed:
+            continue
+        
+        duplicates = _existing_fingerprints(Expense, user_id, [p[0] for p in parsed])
+        fresh = [p for p in parsed if p[0] not in duplicates]
+        result['duplicates'] += len(parsed) - len(fresh)
+        if not fresh:
+            continue
+        
+        result['categories_created'] += _resolve_categories(user_id, [p[1] for p in fresh], category_ids)
+        rows = []
+        deltas = defaultdict(lambda: [0, 0])
+        for fingerprint, category, expense_date, amount, description in fresh:
+            category_id = category_ids[category.lower()]
+            rows.append({
+                'user_id': user_id,
+                'category_id': category_id,
+                'amount_minor': amount,
+                'expense_date': expense_date,
+                'description': description,
+                'import_fingerprint': fingerprint
+            })
+            delta = deltas[(user_id, expense_date.year, expense_date.month, category_id)]
+            delta[0] += amount
+            delta[1] += 1
+        
+        db.session.execute(Expense.__table__.insert(), rows)
+        rollups.apply_expense_deltas(deltas)
+        bump_data_version(user_id)
+        db.session.commit()
+        result['imported'] += len(rows)
+    if result['categories_created']:
+        refdata.invalidate_categories(user_id)
+    return result
+
+def import_income_csv(user_id, stream, batch_size=IMPORT_BATCH_SIZE, encoding=DEFAULT_ENCODING):
+    """
+    Import income from CSV with columns date, amount, source.
+    Returns a summary dict of counts and errors.
+    """
+    result = _new_result()
+    seen = Counter()
+    
+    for batch in _batches(_read_rows(stream, encoding, result), batch_size):
+        parsed = []
+        for line, row in batch:
+            try:
+                source = (row.get('source') or '').strip()[:100] or 'Salary'
+                income_date = _parse_date(row.get('date'))
+                amount = _parse_amount(row.get('amount'))
+            except (ValueError, AttributeError) as e:
+                _add_error(result, line, str(e))
+                continue
+            fingerprint = _fingerprint(user_id, seen, income_date, from_minor(amount), source.lower())
+            parsed.append((fingerprint, source, income_date, amount))
+        if not parsed:
+            continue
+        
+        duplicates = _existing_fingerprints(Income, user_id, [p[0] for p in parsed])
+        fresh = [p for p in parsed if p[0] not in duplicates]
+        result['duplicates'] += len(parsed) - len(fresh)
+        if not fresh:
+            continue
+        
+        rows = []
+        deltas = defaultdict(lambda: [0, 0])
+        for fingerprint, source, income_date, amount in fresh:
+            rows.append({
+                'user_id': user_id,
+                'amount_minor': amount,
+                'income_date': income_date,
+                'source': source,
+                'import_fingerprint': fingerprint
+            })
+            delta = deltas[(user_id, income_date.year, income_date.month)]
+            delta[0] += amount
+            delta[1] += 1
+        
+        db.session.execute(Income.__table__.insert(), rows)
+        rollups.apply_income_deltas(deltas)
+        bump_data_version(user_id)
+        db.session.commit()
+        result['imported'] += len(rows)
+    return result
+
+def import_summary(result, noun):
+    """One-line description of an import result for flash messages and the CLI."""
+    message = f"Imported {result['imported']} {noun}."
+    if result['duplicates']:
+        message += f" Skipped {result['duplicates']} already imported."
+    if result['categories_created']:
+        message += f" Created {result['categories_created']} new categories."
+    if result['stopped']:
+        message += f" {result['stopped']}"
+    return message
@@ -0,0 +1,95 @@
+"""
+Password service - Configurable hashing on a bounded process pool.
+Hashing and verification are deliberately slow, so they run in a small
+pool of PASSWORD_HASH_WORKERS processes: a login burst then uses at most
+that many cores instead of pinning every request worker. Pending work is
+capped at PASSWORD_HASH_MAX_PENDING; past that, callers get
+PasswordHasherBusy instead of queueing without bound. With 0 workers
+hashing runs inline. Hashes made with other parameters than
+PASSWORD_HASH_METHOD are reported by needs_rehash() so logins can upgrade them.
+"""
+
+import os
+import threading
+from flask import current_app, has_app_context
+from werkzeug.security import (
+    DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+)
+
+DEFAULT_METHOD = f'pbkdf2:sha256:{DEFAULT_PBKDF2_ITERATIONS}'
+
+class PasswordHasherBusy(RuntimeError):
+    """Too many hashing requests are already queued, or one took too long."""
+
+# Hashing pool state, per worker process
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+_pending = None
+
+def _settings():
+    config = current_app.config if has_app_context() else {}
+    return {
+        'method': config.get('PASSWORD_HASH_METHOD', DEFAULT_METHOD),
+        'salt_length': config.get('PASSWORD_SALT_LENGTH', 16),
+        'workers': config.get('PASSWORD_HASH_WORKERS', 0),
+        'max_pending': config.get('PASSWORD_HASH_MAX_PENDING', 32),
+        'timeout': config.get('PASSWORD_HASH_TIMEOUT', 10),
+    }
+
+def _get_executor(workers, max_pending):
+    """Return this process's hashing pool, creating it lazily (and again after a fork)."""
+    global _executor, _executor_pid, _pending
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            # Imported here so app startup does not pay for multiprocessing
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            # 'spawn' children import only werkzeug to run the hash, not this app
+            _executor = ProcessPoolExecutor(max_workers=workers,
+                                            mp_context=multiprocessing.get_context('spawn'))
+            _executor_pid = os.getpid()
+            _pending = threading.BoundedSemaphore(max_pending)
+        return _executor, _pending
+
+def _run(func, *args):
+    """Run func(*args) on the pool (or inline without one) within the pending limit."""
+    settings = _settings()
+    if not settings['workers']:
+        return func(*args)
+    
+    from concurrent.futures import TimeoutError as FutureTimeout
+    executor, pending = _get_executor(settings['workers'], settings['max_pending'])
+    if not pending.acquire(timeout=settings['timeout']):
+        raise PasswordHasherBusy('password hashing queue is full')
+    try:
+        return executor.submit(func, *args).result(timeout=settings['timeout'])
+    except FutureTimeout:
+        raise PasswordHasherBusy('password hashing timed out')
+    finally:
+        pending.release()
+
+def normalize_method(method):
+    """Spell out werkzeug's defaults, e.g. 'pbkdf2' -> 'pbkdf2:sha256:600000'."""
+    name, *args = method.split(':')
+    if name == 'pbkdf2':
+        hash_name = args[0] if args else 'sha256'
+        iterations = args[1] if len(args) > 1 else DEFAULT_PBKDF2_ITERATIONS
+        return f'pbkdf2:{hash_name}:{iterations}'
+    if name == 'scrypt' and not args:
+        return 'scrypt:32768:8:1'
+    return method
+
+def hash_password(password):
+    """Hash a password with the configured method and cost."""
+    settings = _settings()
+    return _run(generate_password_hash, password, settings['method'], settings['salt_length'])
+
+def verify_password(password_hash, password):
+    """Check a password against a stored hash."""
+    return _run(check_password_hash, password_hash, password)
+
+def needs_rehash(password_hash):
+    """True when a stored hash was made with other parameters than the configured ones."""
+    stored_method = password_hash.split('$', 1)[0]
+    return stored_method != normalize_method(_settings()['method'])
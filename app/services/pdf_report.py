@@ -0,0 +1,121 @@
+"""
+PDF report builder - Expense reports for one month up to a year.
+Summary and per-category sections are aggregated in SQL from the rollups,
+and detail rows stream in as tuples split into page-sized tables, so
+layout time grows linearly with the number of rows.
+"""
+
+from app.services.exports import iter_expense_rows
+from app.services.rollups import get_category_totals, get_period_totals
+from app.utils.dates import period_bounds
+from app.utils.money import format_minor
+
+# Detail rows per table - roughly one letter page at 9pt with padding
+DETAIL_ROWS_PER_TABLE = 40
+
+_styles = None
+
+def get_report_styles():
+    """Build the paragraph and table styles once per process and reuse them."""
+    global _styles
+    if _styles is None:
+        from reportlab.lib import colors
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.platypus import TableStyle
+        
+        sample = getSampleStyleSheet()
+        _styles = {
+            'title': ParagraphStyle(name='ReportTitle', fontSize=16, spaceAfter=20),
+            'heading': sample['Heading2'],
+            'normal': sample['Normal'],
+            'summary': TableStyle([
+                ('BACKGROUND', (0, 0), (-1, -1), colors.lightgrey),
+                ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+                ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, -1), 10),
+                ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+                ('TOPPADDING', (0, 0), (-1, -1), 8),
+            ]),
+            'grid': TableStyle([
+                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, -1), 9),
+                ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+                ('TOPPADDING', (0, 0), (-1, -1), 6),
+                ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+            ]),
+        }
+    return _styles
+
+def _detail_tables(rows, col_widths, style):
+    """Yield (Table, row count) pairs of at most DETAIL_ROWS_PER_TABLE detail rows."""
+    from reportlab.platypus import Table
+    
+    header = ['Date', 'Category', 'Amount', 'Description']
+    chunk = []
+    for expense_date, category_name, amount_minor, description in rows:
+        chunk.append([
+            expense_date.strftime('%Y-%m-%d'),
+            category_name,
+            format_minor(amount_minor),
+            (description or '')[:50]
+        ])
+        if len(chunk) == DETAIL_ROWS_PER_TABLE:
+            yield Table([header] + chunk, colWidths=col_widths, style=style, repeatRows=1), len(chunk)
+            chunk = []
+    if chunk:
+        yield Table([header] + chunk, colWidths=col_widths, style=style, repeatRows=1), len(chunk)
+
+def build_expense_report(fileobj, user_id, start, end, title):
+    """
+    Render the expense report for (year, month) start to end into fileobj.
+    Returns the number of detail rows written.
+    """
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Table, Paragraph, Spacer
+    
+    styles = get_report_styles()
+    doc = SimpleDocTemplate(fileobj, pagesize=letter, rightMargin=72, leftMargin=72)
+    elements = [Paragraph(f"<b>{title}</b>", styles['title']), Spacer(1, 12)]
+    
+    # Summary
+    income_total, expense_total = get_period_totals(user_id, start, end)
+    elements.append(Table([
+        ['Total Income', format_minor(income_total)],
+        ['Total Expense', format_minor(expense_total)],
+        ['Savings', format_minor(income_total - expense_total)]
+    ], style=styles['summary']))
+    elements.append(Spacer(1, 20))
+    
+    # Per-category totals
+    categories = get_category_totals(user_id, start, end)
+    if categories:
+        elements.append(Paragraph("<b>Spending by Category</b>", styles['heading']))
+        elements.append(Spacer(1, 8))
+        category_rows = [['Category', 'Expenses', 'Amount', 'Share']]
+        for name, total, count in categories:
+            share = (total / expense_total * 100) if expense_total else 0
+            category_rows.append([name, str(count), format_minor(total), f'{share:.1f}%'])
+        elements.append(Table(category_rows, colWidths=[2.4*inch, 1*inch, 1.4*inch, 1*inch],
+                              style=styles['grid'], repeatRows=1))
+        elements.append(Spacer(1, 20))
+    
+    # Expense details in page-sized chunks
+    elements.append(Paragraph("<b>Expense Details</b>", styles['heading']))
+    elements.append(Spacer(1, 8))
+    
+    first_day, end_day = period_bounds(start, end)
+    detail_count = 0
+    col_widths = [1.2*inch, 1.2*inch, 1*inch, 2.6*inch]
+    rows = iter_expense_rows(user_id, first_day, end_day)
+    for table, row_count in _detail_tables(rows, col_widths, styles['grid']):
+        elements.append(table)
+        detail_count += row_count
+    
+    if not detail_count:
+        elements.append(Paragraph("No expenses for this period.", styles['normal']))
+    
+    doc.build(elements)
+    return detail_count
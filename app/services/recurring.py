@@ -0,0 +1,200 @@
+"""
+Recurring service - Materializes due recurring rules as expense and income rows.
+One pass walks the due rules of all users (or some) in chunks of
+RECURRING_BATCH_SIZE rules and at most RECURRING_MAX_ROWS generated rows.
+Each chunk is a single transaction: generated rows are bulk inserted,
+rollups get their deltas, the rules' next_date moves past the generated
+occurrences and the owners' data versions are bumped. A rule with more
+rows due than fit continues in the next chunk. Rows carry their rule id and a unique (rule, date) index, and
+occurrences that already exist are skipped, so running a pass again (or
+concurrently) never creates duplicates.
+Run from `flask recurring run` or lazily when a user opens their pages.
+"""
+
+import calendar
+import logging
+from collections import defaultdict
+from datetime import date, timedelta
+from flask import current_app
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.exc import IntegrityError, OperationalError
+from app import db
+from app.models.expense import Expense
+from app.models.income import Income
+from app.models.recurring import RecurringRule
+from app.services import rollups
+from app.services.cache import bump_data_versions, get_or_set, user_cache_key
+
+logger = logging.getLogger(__name__)
+
+def occurrence_date(start, frequency, interval, n):
+    """
+    The n-th occurrence (0 = start). Monthly and yearly rules keep the start
+    day, clamped to short months (31 Jan, 28 Feb, 31 Mar, ...).
+    """
+    if frequency == 'daily':
+        return start + timedelta(days=n * interval)
+    if frequency == 'weekly':
+        return start + timedelta(weeks=n * interval)
+    months = n * interval * (12 if frequency == 'yearly' else 1)
+    year, month = divmod(start.year * 12 + start.month - 1 + months, 12)
+    return date(year, month + 1, min(start.day, calendar.monthrange(year, month + 1)[1]))
+
+def occurrence_index(start, frequency, interval, day):
+    """Index of the occurrence falling on `day` (an occurrence date)."""
+    if frequency == 'daily':
+        return (day - start).days // interval
+    if frequency == 'weekly':
+        return (day - start).days // (7 * interval)
+    months = (day.year - start.year) * 12 + day.month - start.month
+    return months // (interval * (12 if frequency == 'yearly' else 1))
+
+def due_dates(rule, until, limit=None):
+    """
+    Return (dates from rule.next_date up to until, the following next_date or
+    None). With a limit, at most that many dates are returned and next_date
+    is the first one left out.
+    """
+    end = min(until, rule.end_date) if rule.end_date else until
+    n = occurrence_index(rule.start_date, rule.frequency, rule.interval, rule.next_date)
+    day, dates = rule.next_date, []
+    while day <= end and (limit is None or len(dates) < limit):
+        dates.append(day)
+        n += 1
+        try:
+            day = occurrence_date(rule.start_date, rule.frequency, rule.interval, n)
+        except (ValueError, OverflowError):
+            # Past date.max: the schedule has no further occurrences
+            return dates, None
+    if rule.end_date and day > rule.end_date:
+        day = None
+    return dates, day
+
+def _existing(model, date_column, rule_ids, since):
+    """(rule id, date) pairs already materialized for the given rules from `since` on."""
+    return set(db.session.execute(select(model.recurring_rule_id, date_column).where(
+        model.recurring_rule_id.in_(rule_ids), date_column >= since
+    )).tuples())
+
+def _materialize_chunk(rules, until, max_rows):
+    """
+    Generate up to max_rows occurrences for one chunk of rules. Returns
+    (expenses, income created, rules caught up); the chunk stops at the
+    first rule that still has occurrences due.
+    """
+    rule_ids = [rule.rule_id for rule in rules]
+    since = min(rule.next_date for rule in rules)
+    existing = (_existing(Expense, Expense.expense_date, rule_ids, since)
+                | _existing(Income, Income.income_date, rule_ids, since))
+    
+    expense_rows, income_rows, next_dates = [], [], []
+    expense_deltas = defaultdict(lambda: (0, 0))
+    income_deltas = defaultdict(lambda: (0, 0))
+    caught_up = 0
+    for rule in rules:
+        try:
+            dates, next_date = due_dates(rule, until, max_rows)
+        except (ValueError, OverflowError) as exc:
+            # A schedule that cannot be computed ends the rule instead of failing every pass
+            logger.warning('Ending recurring rule %s: %s', rule.rule_id, exc)
+            dates, next_date = [], None
+        next_dates.append({'k_rule_id': rule.rule_id, 'v_next_date': next_date})
+        max_rows -= len(dates)
+        for day in dates:
+            if (rule.rule_id, day) in existing:
+                continue
+            if rule.kind == 'expense':
+                expense_rows.append({
+                    'user_id': rule.user_id, 'category_id': rule.category_id,
+                    'amount_minor': rule.amount_minor, 'expense_date': day,
+                    'description': rule.description or '', 'recurring_rule_id': rule.rule_id,
+                })
+                key = (rule.user_id, day.year, day.month, rule.category_id)
+                total, count = expense_deltas[key]
+                expense_deltas[key] = (total + rule.amount_minor, count + 1)
+            else:
+                income_rows.append({
+                    'user_id': rule.user_id, 'amount_minor': rule.amount_minor,
+                    'income_date': day, 'source': rule.source or 'Salary',
+                    'recurring_rule_id': rule.rule_id,
+                })
+                key = (rule.user_id, day.year, day.month)
+                total, count = income_deltas[key]
+                income_deltas[key] = (total + rule.amount_minor, count + 1)
+        if next_date is not None and next_date <= until:
+            break
+        caught_up += 1
+    
+    table = RecurringRule.__table__
+    db.session.execute(
+        table.update().where(table.c.rule_id == bindparam('k_rule_id')).values(
+            next_date=bindparam('v_next_date')
+        ),
+        next_dates
+    )
+    if expense_rows:
+        db.session.execute(Expense.__table__.insert(), expense_rows)
+        rollups.apply_expense_deltas(dict(expense_deltas))
+    if income_rows:
+        db.session.execute(Income.__table__.insert(), income_rows)
+        rollups.apply_income_deltas(dict(income_deltas))
+    users = {row['user_id'] for row in expense_rows + income_rows}
+    if users:
+        bump_data_versions(users)
+    return len(expense_rows), len(income_rows), caught_up
+
+def materialize_due(until=None, user_ids=None, batch_size=None, max_rows=None):
+    """
+    Create every occurrence due up to `until` (default today) for all users
+    or only `user_ids`, committing once per chunk of rules and rows. Returns
+    {'rules', 'expenses', 'income'} counts.
+    """
+    until = until or date.today()
+    batch_size = batch_size or current_app.config['RECURRING_BATCH_SIZE']
+    max_rows = max_rows or current_app.config['RECURRING_MAX_ROWS']
+    # Plain rows rather than ORM objects: next_date is updated in bulk below
+    due = select(*RecurringRule.__table__.c).where(
+        RecurringRule.next_date.isnot(None), RecurringRule.next_date <= until
+    ).order_by(RecurringRule.rule_id).limit(batch_size)
+    if user_ids is not None:
+        due = due.where(RecurringRule.user_id.in_(list(user_ids)))
+    
+    result = {'rules': 0, 'expenses': 0, 'income': 0}
+    last_id = 0
+    while True:
+        rules = db.session.execute(due.where(RecurringRule.rule_id > last_id)).all()
+        if not rules:
+            return result
+        expenses, income, caught_up = _materialize_chunk(rules, until, max_rows)
+        db.session.commit()
+        # A rule that ran out of rows is fetched again with its new next_date
+        if caught_up:
+            last_id = rules[caught_up - 1].rule_id
+        result['rules'] += caught_up
+        result['expenses'] += expenses
+        result['income'] += income
+
+def materialize_for_user(user_id):
+    """
+    Lazily materialize the current user's due rules, at most once per data
+    version and day. Losing a race with another pass is harmless: that pass
+    already created the rows.
+    """
+    def run():
+        try:
+            return materialize_due(user_ids=[user_id])
+        except (IntegrityError, OperationalError) as exc:
+            db.session.rollback()
+            logger.info('Recurring rules for user %s were materialized concurrently: %s', user_id, exc)
+            return {}
+    
+    if current_app.config['RECURRING_LAZY']:
+        get_or_set(user_cache_key('recurring_checked'), run)
+
+def detach_rule(rule_id):
+    """Keep a rule's generated rows as ordinary entries before the rule is deleted."""
+    for model in (Expense, Income):
+        db.session.execute(
+            update(model).where(model.recurring_rule_id == rule_id).values(recurring_rule_id=None)
+            .execution_options(synchronize_session=False)
+        )
@@ -0,0 +1,113 @@
+"""
+Reference data cache - User identity and per-user category lists.
+These rarely change but are read on nearly every request (session user
+loading, category dropdowns, ownership checks), so they are kept in the
+result cache backend for REFDATA_TTL seconds and memoised on `g` within a
+request. Writers call invalidate_user()/invalidate_categories() after
+committing; the data version is not cached here (see cache.get_data_version).
+Category lists are keyed by the user's data version, which every category
+write bumps in its transaction, so workers with a process-local backend
+never check ownership against a list another worker has changed.
+"""
+
+from collections import namedtuple
+from datetime import datetime
+from flask import current_app, g, has_app_context
+from sqlalchemy import select
+from sqlalchemy.orm import make_transient_to_detached
+from app import db
+from app.models.category import Category
+from app.models.user import User
+from app.services.cache import get_backend, get_data_version
+
+# Lightweight stand-in for Category rows in dropdowns and filters
+CategoryRef = namedtuple('CategoryRef', ['category_id', 'category_name'])
+
+# Columns kept in the cache; the password hash and data version are always read fresh
+USER_FIELDS = ('user_id', 'name', 'email', 'created_at')
+
+def _memo():
+    if not has_app_context():
+        return {}
+    if 'refdata' not in g:
+        g.refdata = {}
+    return g.refdata
+
+def _ttl():
+    return current_app.config['REFDATA_TTL']
+
+def _user_key(user_id):
+    return f'ref:user:{user_id}'
+
+def _categories_key(user_id):
+    return f'ref:categories:{user_id}:{get_data_version(user_id)}'
+
+def get_user(user_id):
+    """
+    Return the User for user_id attached to the session without a query
+    when its identity is cached, or None if there is no such user.
+    """
+    memo = _memo()
+    key = _user_key(user_id)
+    if key in memo:
+        return memo[key]
+    
+    data = get_backend().get(key)
+    if data is None:
+        user = db.session.get(User, user_id)
+        if user is None:
+            return None
+        data = {field: getattr(user, field) for field in USER_FIELDS}
+        data['created_at'] = data['created_at'].isoformat() if data['created_at'] else None
+        get_backend().set(key, data, _ttl())
+    else:
+        values = dict(data)
+        values['created_at'] = datetime.fromisoformat(values['created_at']) if values['created_at'] else None
+        user = User(**values)
+        # Attach the cached state as-is; other columns load on first access
+        make_transient_to_detached(user)
+        user = db.session.merge(user, load=False)
+    memo[key] = user
+    return user
+
+def invalidate_user(user_id):
+    """Drop a user's cached identity after their row changes."""
+    get_backend().delete(_user_key(user_id))
+    _memo().pop(_user_key(user_id), None)
+
+def get_categories(user_id):
+    """The user's categories as CategoryRef tuples sorted by name."""
+    memo = _memo()
+    key = _categories_key(user_id)
+    if key in memo:
+        return memo[key]
+    
+    rows = get_backend().get(key)
+    if rows is None:
+        rows = [list(row) for row in db.session.execute(
+            select(Category.category_id, Category.category_name)
+            .where(Category.user_id == user_id)
+            .order_by(Category.category_name)
+        )]
+        get_backend().set(key, rows, _ttl())
+    categories = [CategoryRef(*row) for row in rows]
+    memo[key] = categories
+    return categories
+
+def get_category_ids(user_id):
+    """Set of the user's category ids, for ownership checks."""
+    return {c.category_id for c in get_categories(user_id)}
+
+def owns_category(user_id, category_id):
+    return category_id in get_category_ids(user_id)
+
+def invalidate_categories(user_id):
+    """
+    Drop a user's cached category list after categories are added, renamed
+    or removed. Lists cached under older data versions are never read again
+    and age out of the backend.
+    """
+    get_backend().delete(_categories_key(user_id))
+    memo = _memo()
+    for key in [key for key in memo if key.startswith(f'ref:categories:{user_id}:')]:
+        del memo[key]
@@ -0,0 +1,193 @@
+"""
+Report service - Renders PDF/Excel reports and runs them as background jobs.
+Finished files are kept on disk keyed by (user, report type, period, data
+version), so a repeat request for unchanged data is served from disk.
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from app.utils.dates import period_bounds
+
+logger = logging.getLogger(__name__)
+
+REPORT_TYPES = {
+    'pdf': {'mimetype': 'application/pdf', 'extension': 'pdf'},
+    'excel': {
+        'mimetype': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        'extension': 'xlsx'
+    },
+}
+
+# Job ids double as artifact names: u<user>-<type>-<YYYYMM>-<YYYYMM>-v<data version>
+JOB_ID_PATTERN = re.compile(r'^u(\d+)-(pdf|excel)-(\d{6})-(\d{6})-v(\d+)$')
+
+def describe_report(report_type, start, end):
+    """Return (title, download filename) for a report over (year, month) start to end."""
+    extension = REPORT_TYPES[report_type]['extension']
+    prefix = 'expense_report' if report_type == 'pdf' else 'expenses'
+    if start == end:
+        if report_type == 'pdf':
+            title = f"Expense Report - {datetime(start[0], start[1], 1).strftime('%B %Y')}"
+        else:
+            title = f"Expenses {start[1]}-{start[0]}"
+        return title, f"{prefix}_{start[0]}_{start[1]:02d}.{extension}"
+    
+    if report_type == 'pdf':
+        title = (f"Expense Report - {datetime(start[0], start[1], 1).strftime('%b %Y')} "
+                 f"to {datetime(end[0], end[1], 1).strftime('%b %Y')}")
+    else:
+        title = f"Expenses {start[1]}-{start[0]} to {end[1]}-{end[0]}"
+    return title, f"{prefix}_{start[0]}_{start[1]:02d}_to_{end[0]}_{end[1]:02d}.{extension}"
+
+def render_report(report_type, fileobj, user_id, start, end):
+    """Write a report of the given type for (year, month) start to end into fileobj."""
+    title, _ = describe_report(report_type, start, end)
+    if report_type == 'pdf':
+        from app.services.pdf_report import build_expense_report
+        build_expense_report(fileobj, user_id, start, end, title)
+    else:
+        from app.services.exports import write_expenses_xlsx
+        first_day, end_day = period_bounds(start, end)
+        # Excel limits sheet titles to 31 characters
+        write_expenses_xlsx(fileobj, user_id, first_day, end_day, title[:31])
+
+# Background job pool state, per worker process
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+_running = {}
+
+def _get_executor(max_workers):
+    """Return this process's job pool, creating it lazily (and again after a fork)."""
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='report-job')
+            _executor_pid = os.getpid()
+            _running.clear()
+        return _executor
+
+def make_job_id(user_id, report_type, start, end, data_version):
+    """Deterministic job id for one report over one version of a user's data."""
+    return f"u{user_id}-{report_type}-{start[0]}{start[1]:02d}-{end[0]}{end[1]:02d}-v{data_version}"
+
+def parse_job_id(job_id):
+    """Return (user_id, report_type, start, end) for a valid job id, else None."""
+    match = JOB_ID_PATTERN.match(job_id or '')
+    if not match:
+        return None
+    user_id, report_type, start, end, _ = match.groups()
+    return (int(user_id), report_type,
+            (int(start[:4]), int(start[4:])), (int(end[:4]), int(end[4:])))
+
+def artifact_path(config, job_id):
+    """Path of the finished file for a job."""
+    report_type = parse_job_id(job_id)[1]
+    return os.path.join(config['REPORT_ARTIFACT_DIR'], f"{job_id}.{REPORT_TYPES[report_type]['extension']}")
+
+def _marker_path(config, job_id, kind):
+    """Path of a job's '.pending' or '.error' marker file."""
+    return os.path.join(config['REPORT_ARTIFACT_DIR'], f'{job_id}.{kind}')
+
+def get_job_status(config, job_id):
+    """
+    Return 'done', 'pending', 'failed' or None (unknown) for a job.
+    Status is read from disk so any worker process can answer it.
+    """
+    if os.path.exists(artifact_path(config, job_id)):
+        return 'done'
+    if os.path.exists(_marker_path(config, job_id, 'error')):
+        return 'failed'
+    future = _running.get(job_id)
+    if future is not None and not future.done():
+        return 'pending'
+    pending_marker = _marker_path(config, job_id, 'pending')
+    try:
+        if time.time() - os.path.getmtime(pending_marker) < config['REPORT_JOB_TIMEOUT']:
+            return 'pending'
+    except OSError:
+        pass
+    return None
+
+def submit_report_job(app, user_id, report_type, start, end, data_version):
+    """
+    Queue a report unless an artifact for this data version already exists.
+    Returns (job_id, status).
+    """
+    config = app.config
+    os.makedirs(config['REPORT_ARTIFACT_DIR'], exist_ok=True)
+    job_id = make_job_id(user_id, report_type, start, end, data_version)
+    
+    status = get_job_status(config, job_id)
+    if status == 'done':
+        # Refresh the mtime so size-based eviction treats it as recently used
+        os.utime(artifact_path(config, job_id))
+        return job_id, status
+    if status == 'pending':
+        return job_id, status
+    
+    try:
+        os.remove(_marker_path(config, job_id, 'error'))
+    except OSError:
+        pass
+    open(_marker_path(config, job_id, 'pending'), 'w').close()
+    executor = _get_executor(config['REPORT_JOB_WORKERS'])
+    _running[job_id] = executor.submit(_run_job, app, job_id, user_id, report_type, start, end)
+    return job_id, 'pending'
+
+def _run_job(app, job_id, user_id, report_type, start, end):
+    """Render one report in a pool thread, publishing it with an atomic rename."""
+    config = app.config
+    path = artifact_path(config, job_id)
+    tmp_path = f'{path}.tmp-{os.getpid()}-{threading.get_ident()}'
+    try:
+        with app.app_context():
+            with open(tmp_path, 'wb') as fileobj:
+                render_report(report_type, fileobj, user_id, start, end)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        logger.exception('Report job %s failed', job_id)
+        with open(_marker_path(config, job_id, 'error'), 'w') as marker:
+            marker.write(str(e))
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    finally:
+        try:
+            os.remove(_marker_path(config, job_id, 'pending'))
+        except OSError:
+            pass
+        _running.pop(job_id, None)
+        evict_artifacts(config)
+
+def evict_artifacts(config):
+    """
+    Remove artifacts older than REPORT_ARTIFACT_MAX_AGE, then the least
+    recently used ones until the directory fits REPORT_ARTIFACT_MAX_BYTES.
+    Returns the number of files removed.
+    """
+    directory = config['REPORT_ARTIFACT_DIR']
+    now = time.time()
+    files = []
+    for entry in os.scandir(directory):
+        if not entry.is_file() or entry.name.endswith('.pending') or '.tmp-' in entry.name:
+            continue
+        stat = entry.stat()
+        files.append((stat.st_mtime, stat.st_size, entry.path))
+    
+    removed = 0
+    total_size = sum(size for _, size, _ in files)
+    for mtime, size, path in sorted(files):
+        if now - mtime <= config['REPORT_ARTIFACT_MAX_AGE'] and total_size <= config['REPORT_ARTIFACT_MAX_BYTES']:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total_size -= size
+        removed += 1
+    return removed
@@ -0,0 +1,190 @@
+"""
+Rollup service - Maintains and reads the monthly expense/income rollups.
+Write paths call track_expense()/track_income() before committing, so the
+rollup change lands in the same transaction as the row it describes.
+All totals are integer paise, so rollups always match the base tables exactly.
+"""
+
+from sqlalchemy import bindparam, delete, extract, func, insert, select, tuple_
+from app import db
+from app.models.category import Category
+from app.models.expense import Expense
+from app.models.income import Income
+from app.models.rollup import ExpenseRollup, IncomeRollup
+from app.models.user import User
+
+EXPENSE_KEY = ('user_id', 'year', 'month', 'category_id')
+INCOME_KEY = ('user_id', 'year', 'month')
+
+def _apply_deltas(model, key_columns, deltas, conn=None):
+    """
+    Add (total_minor, count) deltas to rollup rows, inserting rows that do not exist yet.
+    Existing keys are looked up once, then updated and inserted with one
+    executemany statement each, however many keys the deltas touch.
+    """
+    executor = conn if conn is not None else db.session
+    deltas = {key: delta for key, delta in deltas.items() if delta[0] or delta[1]}
+    if not deltas:
+        return
+    
+    table = model.__table__
+    key_cols = [table.c[column] for column in key_columns]
+    existing = set(executor.execute(
+        select(*key_cols).where(tuple_(*key_cols).in_(list(deltas)))
+    ).tuples())
+    
+    updates, inserts = [], []
+    for key, (amount_minor, count) in deltas.items():
+        params = {f'k_{column}': value for column, value in zip(key_columns, key)}
+        if key in existing:
+            updates.append(dict(params, d_total=amount_minor, d_count=count))
+        else:
+            inserts.append(dict(zip(key_columns, key), total_minor=amount_minor, count=count))
+    
+    if updates:
+        executor.execute(
+            table.update().where(*[
+                table.c[column] == bindparam(f'k_{column}') for column in key_columns
+            ]).values(
+                total_minor=table.c.total_minor + bindparam('d_total'),
+                count=table.c.count + bindparam('d_count')
+            ),
+            updates
+        )
+    if inserts:
+        executor.execute(table.insert(), inserts)
+
+def apply_expense_deltas(deltas, conn=None):
+    """Apply {(user_id, year, month, category_id): (amount_minor, count)} to expense rollups."""
+    _apply_deltas(ExpenseRollup, EXPENSE_KEY, deltas, conn)
+
+def apply_income_deltas(deltas, conn=None):
+    """Apply {(user_id, year, month): (amount_minor, count)} to income rollups."""
+    _apply_deltas(IncomeRollup, INCOME_KEY, deltas, conn)
+
+def track_expense(expense, sign=1):
+    """Add an expense to its monthly rollup (sign=-1 removes it)."""
+    key = (expense.user_id, expense.expense_date.year, expense.expense_date.month, expense.category_id)
+    apply_expense_deltas({key: (sign * expense.amount_minor, sign)})
+
+def track_income(income, sign=1):
+    """Add an income entry to its monthly rollup (sign=-1 removes it)."""
+    key = (income.user_id, income.income_date.year, income.income_date.month)
+    apply_income_deltas({key: (sign * income.amount_minor, sign)})
+
+def remove_category(category_id):
+    """Drop the rollup rows of a category whose expenses are being deleted."""
+    db.session.execute(delete(ExpenseRollup).where(ExpenseRollup.category_id == category_id))
+
+def month_span(model, start, end):
+    """Predicate for rollup rows from (year, month) start to end, both inclusive."""
+    period = tuple_(model.year, model.month)
+    return period.between(tuple_(*start), tuple_(*end))
+
+def get_period_totals(user_id, start, end):
+    """Return (income_total, expense_total) in paise for (year, month) start to end inclusive."""
+    income_total = db.session.query(func.sum(IncomeRollup.total_minor)).filter(
+        IncomeRollup.user_id == user_id,
+        month_span(IncomeRollup, start, end)
+    ).scalar() or 0
+    expense_total = db.session.query(func.sum(ExpenseRollup.total_minor)).filter(
+        ExpenseRollup.user_id == user_id,
+        month_span(ExpenseRollup, start, end)
+    ).scalar() or 0
+    return int(income_total), int(expense_total)
+
+def get_category_totals(user_id, start, end):
+    """Return [(category_name, total_minor, count)] for a period, largest total first."""
+    total = func.sum(ExpenseRollup.total_minor)
+    return db.session.query(
+        Category.category_name, total, func.sum(ExpenseRollup.count)
+    ).join(Category, Category.category_id == ExpenseRollup.category_id).filter(
+        ExpenseRollup.user_id == user_id,
+        month_span(ExpenseRollup, start, end),
+        ExpenseRollup.count > 0
+    ).group_by(Category.category_name).order_by(total.desc()).all()
+
+def _expense_source(user_ids):
+    """Grouped expense totals straight from the base table."""
+    year = extract('year', Expense.expense_date)
+    month = extract('month', Expense.expense_date)
+    return select(
+        Expense.user_id, year, month, Expense.category_id,
+        func.sum(Expense.amount_minor), func.count()
+    ).where(Expense.user_id.in_(user_ids)).group_by(
+        Expense.user_id, year, month, Expense.category_id
+    )
+
+def _income_source(user_ids):
+    """Grouped income totals straight from the base table."""
+    year = extract('year', Income.income_date)
+    month = extract('month', Income.income_date)
+    return select(
+        Income.user_id, year, month, func.sum(Income.amount_minor), func.count()
+    ).where(Income.user_id.in_(user_ids)).group_by(Income.user_id, year, month)
+
+def _user_batches(executor, user_ids, batch_size):
+    """Yield lists of user ids, reading all users when none are given."""
+    if user_ids is None:
+        user_ids = executor.execute(select(User.user_id).order_by(User.user_id)).scalars().all()
+    user_ids = list(user_ids)
+    for i in range(0, len(user_ids), batch_size):
+        yield user_ids[i:i + batch_size]
+
+def rebuild_rollups(user_ids=None, batch_size=500, conn=None):
+    """
+    Recompute rollups from the base tables, one batch of users at a time.
+    With the default session each batch is committed on its own; when a
+    connection is passed (migrations) the caller owns the transaction.
+    Returns the number of users rebuilt.
+    """
+    executor = conn if conn is not None else db.session
+    rebuilt = 0
+    for batch in _user_batches(executor, user_ids, batch_size):
+        executor.execute(delete(ExpenseRollup).where(ExpenseRollup.user_id.in_(batch)))
+        executor.execute(delete(IncomeRollup).where(IncomeRollup.user_id.in_(batch)))
+        executor.execute(insert(ExpenseRollup).from_select(
+            ['user_id', 'year', 'month', 'category_id', 'total_minor', 'count'],
+            _expense_source(batch)
+        ))
+        executor.execute(insert(IncomeRollup).from_select(
+            ['user_id', 'year', 'month', 'total_minor', 'count'],
+            _income_source(batch)
+        ))
+        if conn is None:
+            db.session.commit()
+        rebuilt += len(batch)
+    return rebuilt
+
+def _compare(name, expected_rows, actual_rows, key_size):
+    """Return mismatches between base-table totals and stored rollup rows."""
+    expected = {tuple(r[:key_size]): (r[key_size], r[key_size + 1]) for r in expected_rows}
+    actual = {
+        tuple(r[:key_size]): (r[key_size], r[key_size + 1])
+        for r in actual_rows if r[key_size + 1]
+    }
+    return [
+        (name, key, expected.get(key), actual.get(key))
+        for key in sorted(set(expected) | set(actual))
+        if expected.get(key) != actual.get(key)
+    ]
+
+def verify_rollups(user_ids=None, batch_size=500):
+    """
+    Compare rollups with freshly aggregated base tables.
+    Returns a list of (table, key, expected, actual) tuples for rows that differ.
+    """
+    mismatches = []
+    for batch in _user_batches(db.session, user_ids, batch_size):
+        expense_rows = db.session.execute(select(
+            ExpenseRollup.user_id, ExpenseRollup.year, ExpenseRollup.month,
+            ExpenseRollup.category_id, ExpenseRollup.total_minor, ExpenseRollup.count
+        ).where(ExpenseRollup.user_id.in_(batch))).all()
+        mismatches += _compare('expense', db.session.execute(_expense_source(batch)).all(), expense_rows, 4)
+        
+        income_rows = db.session.execute(select(
+            IncomeRollup.user_id, IncomeRollup.year, IncomeRollup.month,
+            IncomeRollup.total_minor, IncomeRollup.count
+        ).where(IncomeRollup.user_id.in_(batch))).all()
+        mismatches += _compare('income', db.session.execute(_income_source(batch)).all(), income_rows, 3)
+    return mismatches
@@ -0,0 +1,155 @@
+"""
+Search service - Full-text search over expense descriptions and category names.
+On SQLite an FTS5 table (expense_search, rowid = expense_id) indexes each
+expense's description and category name. Triggers on expenses and
+categories keep it in sync for every write path (forms, CSV import, batch
+API, category deletes), and `flask search rebuild` recreates it from the
+base tables. Other databases, or SQLite builds without FTS5, fall back to
+a LIKE filter.
+"""
+
+import re
+from sqlalchemy import column, func, inspect, literal_column, or_, select, table, text
+from app import db
+from app.models.category import Category
+from app.models.expense import Expense
+
+SEARCH_TABLE = 'expense_search'
+
+search_index = table(SEARCH_TABLE, column('rowid'), column('description'), column('category'))
+
+# Prefix indexes keep 'ta*'-style queries (search as you type) fast
+SEARCH_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+        description, category, prefix='2 3', tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_insert AFTER INSERT ON expenses BEGIN
+        INSERT INTO {SEARCH_TABLE}(rowid, description, category)
+        SELECT NEW.expense_id, NEW.description, category_name FROM categories
+        WHERE category_id = NEW.category_id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_delete AFTER DELETE ON expenses BEGIN
+        DELETE FROM {SEARCH_TABLE} WHERE rowid = OLD.expense_id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_update
+    AFTER UPDATE OF description, category_id ON expenses BEGIN
+        DELETE FROM {SEARCH_TABLE} WHERE rowid = OLD.expense_id;
+        INSERT INTO {SEARCH_TABLE}(rowid, description, category)
+        SELECT NEW.expense_id, NEW.description, category_name FROM categories
+        WHERE category_id = NEW.category_id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_category
+    AFTER UPDATE OF category_name ON categories BEGIN
+        UPDATE {SEARCH_TABLE} SET category = NEW.category_name WHERE rowid IN (
+            SELECT expense_id FROM expenses
+            WHERE user_id = NEW.user_id AND category_id = NEW.category_id
+        );
+    END""",
+]
+
+# Whether each engine's database has the search table, checked once per engine
+_available = {}
+
+def fts5_supported(conn):
+    """True for SQLite connections whose library was built with FTS5."""
+    if conn.dialect.name != 'sqlite':
+        return False
+    options = conn.exec_driver_sql('PRAGMA compile_options').scalars().all()
+    return 'ENABLE_FTS5' in options
+
+def create_search_index(conn):
+    """Create the FTS5 table and its triggers if missing; returns False when unsupported."""
+    if not fts5_supported(conn):
+        return False
+    for statement in SEARCH_DDL:
+        conn.exec_driver_sql(statement)
+    return True
+
+def rebuild_search_index(conn=None):
+    """
+    Refill the search table from expenses and categories, then merge its
+    segments. Returns the number of expenses indexed (None without FTS5).
+    """
+    executor = conn if conn is not None else db.session
+    if not search_available(conn):
+        return None
+    executor.execute(search_index.delete())
+    executor.execute(search_index.insert().from_select(
+        ['rowid', 'description', 'category'],
+        select(Expense.expense_id, Expense.description, Category.category_name).join(
+            Category, Category.category_id == Expense.category_id
+        )
+    ))
+    executor.execute(text(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('optimize')"))
+    count = executor.execute(select(func.count()).select_from(search_index)).scalar()
+    if conn is None:
+        db.session.commit()
+    return count
+
+def search_available(conn=None):
+    """True when the database has the FTS5 search table."""
+    engine = conn.engine if conn is not None else db.engine
+    if engine not in _available:
+        _available[engine] = inspect(conn if conn is not None else engine).has_table(SEARCH_TABLE)
+    return _available[engine]
+
+def search_terms(query):
+    """Words of a search box entry, lowercased; punctuation is ignored."""
+    return re.findall(r'\w+', (query or '').lower())
+
+def match_query(terms):
+    """
+    FTS5 query requiring every term, the last one as a prefix. Terms are
+    quoted, so operators and column names typed by users are plain words.
+    """
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+def _matches(terms):
+    """MATCH clause on the search table."""
+    return literal_column(SEARCH_TABLE).op('MATCH')(match_query(terms))
+
+def _like_pattern(term):
+    """'%term%' with LIKE wildcards in the term (\\w+ keeps '_') matched literally."""
+    return '%' + term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+
+def _like_filter(terms, user_id):
+    """Fallback: every term in the description or the category name."""
+    clauses = []
+    for term in terms:
+        pattern = _like_pattern(term)
+        categories = select(Category.category_id).where(
+            Category.user_id == user_id, Category.category_name.ilike(pattern, escape='\\')
+        )
+        clauses.append(or_(Expense.description.ilike(pattern, escape='\\'), Expense.category_id.in_(categories)))
+    return clauses
+
+def expense_search_filter(query, user_id):
+    """
+    Filter clauses for Expense queries matching a search box entry, to
+    combine with other filters and pagination. Empty for blank input.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return []
+    if not search_available():
+        return _like_filter(terms, user_id)
+    return [Expense.expense_id.in_(select(search_index.c.rowid).where(_matches(terms)))]
+
+def search_expenses(user_id, query, limit=20):
+    """
+    A user's expenses matching a search box entry, best match first (FTS5
+    bm25 rank; newest first on the LIKE fallback).
+    """
+    terms = search_terms(query)
+    if not terms:
+        return []
+    if not search_available():
+        return Expense.query.filter(Expense.user_id == user_id, *_like_filter(terms, user_id)).order_by(
+            Expense.expense_date.desc(), Expense.expense_id.desc()
+        ).limit(limit).all()
+    return Expense.query.join(search_index, search_index.c.rowid == Expense.expense_id).filter(
+        _matches(terms),
+        Expense.user_id == user_id
+    ).order_by(literal_column(f'{SEARCH_TABLE}.rank')).limit(limit).all()
@@ -0,0 +1,69 @@
+"""
+Date range helpers - Index-friendly month and year filters.
+Comparing a date column against a half-open [start, end) range lets the
+(user_id, date) composite indexes do the work, unlike extract() filters.
+"""
+
+from datetime import date
+from sqlalchemy import and_, extract, false
+
+# Years whose month and year bounds are valid dates (the end of 9999 is not)
+MIN_YEAR, MAX_YEAR = date.min.year, date.max.year - 1
+
+def month_bounds(month, year):
+    """Return the half-open (start, end) dates covering one calendar month."""
+    start = date(year, month, 1)
+    end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return start, end
+
+def year_bounds(year):
+    """Return the half-open (start, end) dates covering one calendar year."""
+    return date(year, 1, 1), date(year + 1, 1, 1)
+
+def month_range_filter(column, month, year):
+    """Predicate matching rows whose date column falls in the given month."""
+    if not 1 <= month <= 12:
+        return false()
+    start, end = month_bounds(month, year)
+    return and_(column >= start, column < end)
+
+def date_filters(column, month=None, year=None):
+    """
+    Build predicates for optional month/year list filters.
+    A month with a year (or a year alone) becomes a date range; a month
+    without a year still matches that month in every year.
+    """
+    if month and not 1 <= month <= 12:
+        return [false()]
+    if year and not MIN_YEAR <= year <= MAX_YEAR:
+        return [false()]
+    if month and year:
+        start, end = month_bounds(month, year)
+    elif year:
+        start, end = year_bounds(year)
+    elif month:
+        return [extract('month', column) == month]
+    else:
+        return []
+    return [column >= start, column < end]
+
+def check_year_month(year, month):
+    """Raise ValueError unless (year, month) is a month that date ranges can cover."""
+    if not 1 <= month <= 12:
+        raise ValueError(f'Invalid month: {month}')
+    if not MIN_YEAR <= year <= MAX_YEAR:
+        raise ValueError(f'Invalid year: {year} (must be {MIN_YEAR} to {MAX_YEAR})')
+
+def parse_year_month(value):
+    """Parse 'YYYY-MM' into a (year, month) tuple, raising ValueError if invalid."""
+    year, month = (int(part) for part in value.split('-'))
+    check_year_month(year, month)
+    return year, month
+
+def months_between(start, end):
+    """Number of calendar months from (year, month) start to end, inclusive."""
+    return (end[0] - start[0]) * 12 + end[1] - start[1] + 1
+
+def period_bounds(start, end):
+    """Half-open (start, end) dates covering (year, month) start to end inclusive."""
+    return month_bounds(start[1], start[0])[0], month_bounds(end[1], end[0])[1]
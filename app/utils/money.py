@@ -0,0 +1,46 @@
+"""
+Money helpers - Amounts are stored as integer minor units (paise).
+Input is parsed with Decimal and rounded half-up to the paisa, so sums and
+rollups are exact integer arithmetic; floats only appear for display.
+"""
+
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+# Minor units per rupee
+MINOR_PER_UNIT = 100
+
+# Largest accepted amount (₹10 trillion) in paise; leaves rollup sums well
+# inside SQLite's signed 64-bit INTEGER
+MAX_MINOR = 10 ** 15
+
+class AmountTooLarge(ValueError):
+    """Raised by to_minor() for amounts beyond MAX_MINOR paise."""
+
+def to_minor(value):
+    """
+    Convert an amount in rupees (str, int, float or Decimal) to integer paise.
+    Raises ValueError for text that is not a finite number or whose
+    magnitude exceeds MAX_MINOR paise.
+    """
+    if isinstance(value, str):
+        value = value.replace(',', '').strip()
+    try:
+        amount = Decimal(str(value))
+    except InvalidOperation:
+        raise ValueError(f'invalid amount "{value}"')
+    if not amount.is_finite():
+        raise ValueError(f'invalid amount "{value}"')
+    # Compared in rupees: scaling a huge exponent would overflow Decimal
+    if abs(amount) > Decimal(MAX_MINOR) / MINOR_PER_UNIT:
+        raise AmountTooLarge(f'amount "{value}" is too large')
+    return int((amount * MINOR_PER_UNIT).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+def from_minor(minor):
+    """Amount in rupees as a float, for templates, charts and spreadsheets."""
+    return (minor or 0) / MINOR_PER_UNIT
+
+def format_minor(minor):
+    """Exact display string such as '₹1,234.50' (or '-₹1,234.50')."""
+    sign = '-' if minor < 0 else ''
+    units, paise = divmod(abs(minor), MINOR_PER_UNIT)
+    return f'{sign}₹{units:,}.{paise:02d}'
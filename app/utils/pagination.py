@@ -0,0 +1,87 @@
+"""
+Keyset pagination - Cursor-based paging ordered by (date desc, id desc).
+Each page seeks straight past the last row seen instead of scanning an
+OFFSET, so deep pages cost the same as the first one.
+"""
+
+import base64
+import json
+from datetime import date
+from sqlalchemy import and_, or_
+
+class KeysetPage:
+    """One page of results with opaque cursors for the neighbouring pages."""
+    
+    def __init__(self, items, next_cursor=None, prev_cursor=None, total=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+        self.total = total
+    
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+    
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+
+def encode_cursor(direction, row_date, row_id):
+    """Pack a page direction and (date, id) position into a URL-safe token."""
+    raw = json.dumps([direction, row_date.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """Unpack a cursor token, returning None for missing or malformed input."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        direction, row_date, row_id = json.loads(raw)
+        if direction not in ('next', 'prev'):
+            return None
+        return direction, date.fromisoformat(row_date), int(row_id)
+    except (ValueError, TypeError):
+        return None
+
+def keyset_paginate(query, date_column, id_column, cursor=None, per_page=10):
+    """
+    Return a KeysetPage of `query` ordered by (date_column desc, id_column desc).
+    A 'next' cursor continues after its row and a 'prev' cursor returns the
+    page before it; an invalid cursor falls back to the first page.
+    """
+    position = decode_cursor(cursor)
+    date_attr, id_attr = date_column.key, id_column.key
+    
+    if position is None:
+        direction = None
+        rows = query.order_by(date_column.desc(), id_column.desc()).limit(per_page + 1).all()
+    else:
+        direction, row_date, row_id = position
+        if direction == 'next':
+            rows = query.filter(or_(
+                date_column < row_date,
+                and_(date_column == row_date, id_column < row_id)
+            )).order_by(date_column.desc(), id_column.desc()).limit(per_page + 1).all()
+        else:
+            rows = query.filter(or_(
+                date_column > row_date,
+                and_(date_column == row_date, id_column > row_id)
+            )).order_by(date_column.asc(), id_column.asc()).limit(per_page + 1).all()
+    
+    has_more = len(rows) > per_page
+    items = rows[:per_page]
+    if direction == 'prev':
+        items.reverse()
+        has_next, has_prev = True, has_more
+    else:
+        has_next, has_prev = has_more, direction == 'next'
+    
+    next_cursor = prev_cursor = None
+    if items and has_next:
+        last = items[-1]
+        next_cursor = encode_cursor('next', getattr(last, date_attr), getattr(last, id_attr))
+    if items and has_prev:
+        first = items[0]
+        prev_cursor = encode_cursor('prev', getattr(first, date_attr), getattr(first, id_attr))
+    return KeysetPage(items, next_cursor, prev_cursor)
@@ -0,0 +1,99 @@
+"""
+Login throughput benchmark - Concurrent logins with inline vs pooled hashing.
+Starts an app per mode on a temporary SQLite file, registers a few users and
+fires logins from client threads, reporting logins/second and latency.
+Inline hashing runs on every request thread at once; the pool caps it at
+PASSWORD_HASH_WORKERS processes and answers 503 past the queue limit.
+Run: python -m benchmarks.bench_login [--threads 8] [--logins 64] [--workers 0 2]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db
+from app.models.user import User
+
+PASSWORD = 'benchmark-password'
+
+def make_app(path, workers, method, max_pending):
+    app = create_app('testing', overrides={
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}',
+        'PASSWORD_HASH_METHOD': method,
+        'PASSWORD_HASH_WORKERS': workers,
+        'PASSWORD_HASH_MAX_PENDING': max_pending,
+        'PASSWORD_HASH_TIMEOUT': 60,
+    })
+    with app.app_context():
+        db.create_all()
+    return app
+
+def add_users(app, count):
+    """Create `count` users sharing one password and return their emails."""
+    emails = [f'bench{i}@example.com' for i in range(count)]
+    with app.app_context():
+        for email in emails:
+            user = User(name='Bench User', email=email)
+            user.set_password(PASSWORD)
+            db.session.add(user)
+        db.session.commit()
+    return emails
+
+def login_once(app, email):
+    """POST one login; return (seconds, status code)."""
+    client = app.test_client()
+    started = time.perf_counter()
+    response = client.post('/auth/login', data={'email': email, 'password': PASSWORD})
+    return time.perf_counter() - started, response.status_code
+
+def run_mode(workers, args):
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(os.path.join(tmp, 'login.db'), workers, args.method, args.max_pending)
+        emails = add_users(app, args.threads)
+        # Start the pool (if any) before timing
+        login_once(app, emails[0])
+        
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.threads) as pool:
+            results = list(pool.map(lambda i: login_once(app, emails[i % len(emails)]),
+                                    range(args.logins)))
+        elapsed = time.perf_counter() - started
+        with app.app_context():
+            db.engine.dispose()
+    
+    latencies = sorted(seconds * 1000 for seconds, status in results if status == 302)
+    busy = sum(1 for _, status in results if status == 503)
+    return {
+        'ok': len(latencies),
+        'busy': busy,
+        'per_second': len(latencies) / elapsed,
+        'p50_ms': statistics.median(latencies) if latencies else 0.0,
+        'p95_ms': latencies[int(len(latencies) * 0.95) - 1] if latencies else 0.0,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--threads', type=int, default=8, help='concurrent clients')
+    parser.add_argument('--logins', type=int, default=64, help='logins per mode')
+    parser.add_argument('--workers', type=int, nargs='+', default=[0, 2],
+                        help='PASSWORD_HASH_WORKERS values to compare (0 = inline)')
+    parser.add_argument('--method', default='pbkdf2:sha256:600000')
+    parser.add_argument('--max-pending', type=int, default=32)
+    args = parser.parse_args()
+    
+    print(f"cpus: {os.cpu_count()}  method: {args.method}  threads: {args.threads}")
+    print(f"{'workers':>8} {'ok':>5} {'busy':>5} {'logins/s':>10} {'p50 ms':>10} {'p95 ms':>10}")
+    for workers in args.workers:
+        result = run_mode(workers, args)
+        print(f"{workers:>8} {result['ok']:>5} {result['busy']:>5} {result['per_second']:>10.1f} "
+              f"{result['p50_ms']:>10.1f} {result['p95_ms']:>10.1f}")
+
+if __name__ == '__main__':
+    main()
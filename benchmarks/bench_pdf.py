@@ -0,0 +1,87 @@
+"""
+PDF report benchmark - Render time against number of expense rows.
+Builds an in-memory database per size and renders a year-long report;
+time per row should stay roughly flat as the row count grows.
+Run: python -m benchmarks.bench_pdf [--sizes 1000 2000 4000 8000]
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import date, timedelta
+from io import BytesIO
+from random import Random
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db
+from app.models.user import User
+from app.models.category import Category
+from app.models.expense import Expense
+from app.services.pdf_report import build_expense_report
+from app.services.rollups import rebuild_rollups
+
+def seed_expenses(rows, seed=42):
+    """Create one user with `rows` expenses spread over 2025 and return the user id."""
+    rng = Random(seed)
+    user = User(name='Bench User', email='bench@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.flush()
+    categories = [Category(user_id=user.user_id, category_name=f'Category {i}') for i in range(8)]
+    db.session.add_all(categories)
+    db.session.flush()
+    
+    first_day = date(2025, 1, 1)
+    db.session.execute(Expense.__table__.insert(), [
+        {
+            'user_id': user.user_id,
+            'category_id': rng.choice(categories).category_id,
+            'amount_minor': round(rng.uniform(10, 2000) * 100),
+            'expense_date': first_day + timedelta(days=rng.randrange(365)),
+            'description': f'Benchmark expense {i}'
+        }
+        for i in range(rows)
+    ])
+    db.session.commit()
+    rebuild_rollups([user.user_id])
+    return user.user_id
+
+def time_report(rows, repeat):
+    """Best-of-`repeat` seconds to render a year report over `rows` expenses."""
+    app = create_app('testing')
+    with app.app_context():
+        user_id = seed_expenses(rows)
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            written = build_expense_report(BytesIO(), user_id, (2025, 1), (2025, 12), 'Benchmark Report')
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        assert written == rows
+        db.session.remove()
+        db.drop_all()
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 2000, 4000, 8000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    
+    # Warm up font and style loading so it is not billed to the first size
+    time_report(100, 1)
+    
+    print(f"{'rows':>8} {'seconds':>10} {'us/row':>10}")
+    per_row = []
+    for rows in args.sizes:
+        seconds = time_report(rows, args.repeat)
+        per_row.append(seconds / rows)
+        print(f"{rows:>8} {seconds:>10.3f} {seconds / rows * 1e6:>10.1f}")
+    
+    # Linear scaling keeps the per-row cost of the largest run close to the smallest
+    print(f"\nper-row cost ratio (largest/smallest size): {per_row[-1] / per_row[0]:.2f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Startup benchmark - Import, app creation and first request in fresh interpreters.
+Each run starts a new Python process (like a gunicorn worker restart) against
+a temporary SQLite file, timing `import app`, create_app() and the first
+request. The first run creates the schema; later runs should skip it.
+Run: python -m benchmarks.bench_startup [--runs 10]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in the child process; prints its timings as JSON
+CHILD = '''
+import json, sys, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+flask_app = app.create_app('testing', overrides={'SQLALCHEMY_DATABASE_URI': sys.argv[1]})
+created = time.perf_counter()
+flask_app.test_client().get('/auth/login')
+served = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'create_ms': (created - imported) * 1000,
+    'first_request_ms': (served - created) * 1000,
+    'total_ms': (served - started) * 1000,
+}))
+'''
+
+STEPS = ('import_ms', 'create_ms', 'first_request_ms', 'total_ms')
+
+def run_child(uri):
+    env = dict(os.environ, FLASK_ENV='testing')
+    output = subprocess.run([sys.executable, '-c', CHILD, uri], cwd=ROOT, env=env,
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10, help='warm boots to time')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        uri = f"sqlite:///{os.path.join(tmp, 'startup.db')}"
+        cold = run_child(uri)
+        warm = [run_child(uri) for _ in range(args.runs)]
+
+    print(f"{'boot':<16}" + ''.join(f'{step:>18}' for step in STEPS))
+    print(f"{'new database':<16}" + ''.join(f'{cold[step]:>18.1f}' for step in STEPS))
+    print(f"{'warm (median)':<16}"
+          + ''.join(f'{statistics.median(r[step] for r in warm):>18.1f}' for step in STEPS))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,347 @@
+"""
+Benchmark suite - Latency, query counts and memory of the hot endpoints.
+Builds (and keeps) a seeded SQLite database per size, then times pages and
+dashboard helpers through the Flask test client. Results are written as JSON
+and can be compared with a saved baseline; regressions beyond the threshold
+make the run exit non-zero.
+Run: python -m benchmarks.run [--sizes 1000 100000 1000000] [--output results.json]
+     python -m benchmarks.run --baseline baseline.json --threshold 0.2
+"""
+
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime
+from random import Random
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_login import login_user
+from sqlalchemy import event, select, text
+from werkzeug.security import generate_password_hash
+from app import create_app, db
+from app.migrations import SCHEMA_VERSION
+from app.models.user import User
+from app.models.category import Category
+from app.models.expense import Expense
+from app.models.income import Income
+from app.models.budget import Budget
+from app.routes import main as dashboard
+from app.services.forecast import forecast_available
+from app.services.rollups import rebuild_rollups
+from app.utils.pagination import encode_cursor
+from scripts.seed_data import build_categories, month_sequence
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+BENCH_EMAIL = 'bench@example.com'
+BENCH_PASSWORD = 'bench123'
+HISTORY_MONTHS = 24
+PER_PAGE = 10
+PERCENTILES = (50, 90, 95, 99)
+
+def database_path(data_dir, rows, seed, end):
+    """Seeded databases are reused while size, seed, last month and schema match."""
+    return os.path.join(data_dir, f'bench_{rows}_s{seed}_{end[0]}{end[1]:02d}_v{SCHEMA_VERSION}.db')
+
+def make_app(path, cache_backend):
+    return create_app('testing', {
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + path,
+        'CACHE_BACKEND': cache_backend,
+    })
+
+def seed_database(path, rows, seed, end, batch_size=50000):
+    """Create one user with `rows` expenses over HISTORY_MONTHS months up to `end`."""
+    rng = Random(seed)
+    app = make_app(path + '.tmp', 'null')
+    with app.app_context():
+        user = User(name='Bench User', email=BENCH_EMAIL,
+                    password_hash=generate_password_hash(BENCH_PASSWORD, method='pbkdf2:sha256'))
+        db.session.add(user)
+        db.session.flush()
+        profiles = build_categories(10)
+        categories = [Category(user_id=user.user_id, category_name=name) for name, _, _ in profiles]
+        db.session.add_all(categories)
+        db.session.flush()
+        
+        today = date.today()
+        periods = month_sequence(end, HISTORY_MONTHS)
+        weights = [1 / (rank + 1) ** 1.1 for rank in range(len(profiles))]
+        cum_weights = [sum(weights[:i + 1]) for i in range(len(weights))]
+        indexes = range(len(profiles))
+        batch = []
+        for i in range(rows):
+            year, month = periods[i * len(periods) // rows]
+            last_day = 28 if (year, month) != (today.year, today.month) else min(today.day, 28)
+            index = rng.choices(indexes, cum_weights=cum_weights)[0]
+            _, median, descriptions = profiles[index]
+            batch.append({
+                'user_id': user.user_id,
+                'category_id': categories[index].category_id,
+                'amount_minor': round(median * rng.lognormvariate(0, 0.7) * 100) or 1,
+                'expense_date': date(year, month, 1 + rng.randrange(last_day)),
+                'description': rng.choice(descriptions)
+            })
+            if len(batch) == batch_size:
+                db.session.execute(Expense.__table__.insert(), batch)
+                batch = []
+        if batch:
+            db.session.execute(Expense.__table__.insert(), batch)
+        
+        db.session.execute(Income.__table__.insert(), [
+            {'user_id': user.user_id, 'amount_minor': 4000000, 'income_date': date(y, m, 1), 'source': 'Salary'}
+            for y, m in periods
+        ])
+        db.session.execute(Budget.__table__.insert(), [
+            {'user_id': user.user_id, 'month': m, 'year': y, 'amount_minor': 3000000}
+            for y, m in periods
+        ])
+        db.session.commit()
+        rebuild_rollups([user.user_id])
+        # Planner statistics, as `flask database maintain` keeps them in production
+        db.session.execute(text('ANALYZE'))
+        db.session.commit()
+        db.session.remove()
+        db.engine.dispose()
+    os.replace(path + '.tmp', path)
+
+def percentile(ordered, pct):
+    """Linearly interpolated percentile of an already sorted list."""
+    position = (len(ordered) - 1) * pct / 100
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+class Runner:
+    """Times benchmark callables and records latency, query count and peak memory."""
+    
+    def __init__(self, app, warmup):
+        self.warmup = warmup
+        self.statements = 0
+        with app.app_context():
+            event.listen(db.engine, 'before_cursor_execute', self._count)
+    
+    def _count(self, *args):
+        self.statements += 1
+    
+    def measure(self, func, repeat):
+        for _ in range(self.warmup):
+            func()
+        
+        samples, queries = [], []
+        for _ in range(repeat):
+            self.statements = 0
+            started = time.perf_counter()
+            func()
+            samples.append((time.perf_counter() - started) * 1000)
+            queries.append(self.statements)
+        
+        # Peak memory is taken on a separate call, tracemalloc slows everything down
+        tracemalloc.start()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        
+        samples.sort()
+        result = {f'p{p}_ms': round(percentile(samples, p), 3) for p in PERCENTILES}
+        result.update({
+            'mean_ms': round(sum(samples) / len(samples), 3),
+            'min_ms': round(samples[0], 3),
+            'max_ms': round(samples[-1], 3),
+            'samples': len(samples),
+            'queries': max(queries),
+            'peak_kb': round(peak / 1024, 1),
+        })
+        return result
+
+def build_benchmarks(app, client, end):
+    """(name, callable, heavy) for every endpoint and helper to time."""
+    with app.app_context():
+        user = db.session.execute(select(User).where(User.email == BENCH_EMAIL)).scalar_one()
+        user_id = user.user_id
+        category_id = db.session.execute(select(Category.category_id).where(
+            Category.user_id == user_id
+        ).order_by(Category.category_id)).scalars().first()
+        ordered = select(Expense.expense_date, Expense.expense_id).where(
+            Expense.user_id == user_id
+        ).order_by(Expense.expense_date.desc(), Expense.expense_id.desc())
+        # Cursors for deep pages, built from the row that ends the previous page
+        cursors = {}
+        for page in (10, 100):
+            row = db.session.execute(ordered.offset(page * PER_PAGE - 1).limit(1)).first()
+            if row:
+                cursors[page] = encode_cursor('next', *row)
+    
+    year, month = end
+    first_year, first_month = month_sequence(end, 12)[0]
+    
+    def get(url):
+        def call():
+            response = client.get(url)
+            assert response.status_code == 200, (url, response.status_code)
+        return call
+    
+    def revalidate(url):
+        etag = client.get(url).headers['ETag']
+        def call():
+            response = client.get(url, headers={'If-None-Match': etag})
+            assert response.status_code == 304, (url, response.status_code)
+        return call
+    
+    def login():
+        response = app.test_client().post('/auth/login', data={'email': BENCH_EMAIL, 'password': BENCH_PASSWORD})
+        assert response.status_code == 302, response.status_code
+    
+    def helper(func):
+        def call():
+            with app.test_request_context():
+                login_user(db.session.get(User, user_id))
+                func()
+        return call
+    
+    benchmarks = [
+        ('dashboard', get('/dashboard'), False),
+        ('chart_categories', get('/dashboard/charts/categories'), False),
+        ('chart_income_vs_expense', get('/dashboard/charts/income-vs-expense'), False),
+        ('chart_revalidate_304', revalidate('/dashboard/charts/income-vs-expense'), False),
+        ('list_expenses', get('/expenses/'), False),
+        ('list_expenses_category', get(f'/expenses/?category={category_id}'), False),
+        ('list_expenses_month', get(f'/expenses/?month={month}&year={year}'), False),
+    ]
+    for page, cursor in cursors.items():
+        benchmarks.append((f'list_expenses_page_{page}', get(f'/expenses/?cursor={cursor}'), False))
+    benchmarks += [
+        ('list_expenses_search', get('/expenses/?q=taxi'), False),
+        ('list_expenses_search_month', get(f'/expenses/?q=taxi&month={month}&year={year}'), False),
+        ('api_expense_search', get('/api/expenses/search?q=taxi'), False),
+    ]
+    benchmarks += [
+        ('list_budgets', get('/budgets/'), False),
+        ('download_pdf', get(f'/reports/pdf?month={month}&year={year}'), True),
+        ('download_excel', get(f'/reports/excel?start={first_year}-{first_month:02d}&end={year}-{month:02d}'), True),
+        ('login', login, True),
+        ('helper_dashboard_totals', helper(dashboard.get_dashboard_totals), False),
+        ('helper_current_month_data', helper(dashboard.get_current_month_data), False),
+        ('helper_category_breakdown', helper(dashboard.get_category_breakdown), False),
+        ('helper_monthly_expense_trend', helper(dashboard.get_monthly_expense_trend), False),
+        ('helper_income_vs_expense', helper(dashboard.get_income_vs_expense_data), False),
+        ('helper_financial_insights', helper(dashboard.get_financial_insights), False),
+    ]
+    if forecast_available():
+        benchmarks += [
+            ('helper_spend_forecast', helper(dashboard.get_spend_forecast), False),
+            ('api_forecast', get('/api/forecast'), False),
+            ('helper_spending_anomalies', helper(dashboard.get_spending_anomalies), False),
+            ('api_anomalies', get('/api/anomalies'), False),
+        ]
+    return benchmarks
+
+def run_size(args, rows):
+    path = database_path(args.data_dir, rows, args.seed, args.end)
+    if not os.path.exists(path):
+        print(f'Seeding {rows} expenses into {path} ...', flush=True)
+        started = time.perf_counter()
+        seed_database(path, rows, args.seed, args.end)
+        print(f'  seeded in {time.perf_counter() - started:.1f}s', flush=True)
+    
+    app = make_app(path, args.cache)
+    runner = Runner(app, args.warmup)
+    client = app.test_client()
+    client.post('/auth/login', data={'email': BENCH_EMAIL, 'password': BENCH_PASSWORD})
+    
+    results = {}
+    for name, func, heavy in build_benchmarks(app, client, args.end):
+        if args.only and not any(pattern in name for pattern in args.only):
+            continue
+        repeat = max(3, args.repeat // 5) if heavy else args.repeat
+        results[name] = runner.measure(func, repeat)
+        r = results[name]
+        print(f"{rows:>8} {name:<30} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['queries']:>7} {r['peak_kb']:>10.1f}", flush=True)
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+    return results
+
+def compare(results, baseline, threshold, min_delta_ms):
+    """
+    Regressions against a baseline: p50 latency up by more than `threshold`
+    (as a fraction) and by at least `min_delta_ms`, so timer noise on very
+    fast calls is ignored, or more SQL statements per call than before.
+    """
+    regressions = []
+    for size, benchmarks in results.items():
+        for name, current in benchmarks.items():
+            previous = baseline.get(size, {}).get(name)
+            if previous is None:
+                continue
+            change = current['p50_ms'] / previous['p50_ms'] - 1 if previous['p50_ms'] else 0
+            if change > threshold and current['p50_ms'] - previous['p50_ms'] >= min_delta_ms:
+                regressions.append(f"{size} {name}: p50 {previous['p50_ms']:.2f} -> {current['p50_ms']:.2f} ms (+{change:.0%})")
+            if current['queries'] > previous['queries']:
+                regressions.append(f"{size} {name}: queries {previous['queries']} -> {current['queries']}")
+    return regressions
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 100000, 1000000],
+                        help='expenses per user in each seeded database')
+    parser.add_argument('--repeat', type=int, default=20, help='timed calls per benchmark (heavy ones run a fifth)')
+    parser.add_argument('--warmup', type=int, default=2, help='untimed calls before timing')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--end', default=date.today().strftime('%Y-%m'), help='last month of seeded data (YYYY-MM)')
+    parser.add_argument('--cache', default='null', help='CACHE_BACKEND while timing (null measures uncached work)')
+    parser.add_argument('--only', nargs='+', help='run benchmarks whose name contains any of these')
+    parser.add_argument('--data-dir', default=DATA_DIR, help='where seeded databases are kept')
+    parser.add_argument('--output', help='write results JSON here')
+    parser.add_argument('--baseline', help='results JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2, help='allowed p50 slowdown as a fraction')
+    parser.add_argument('--min-delta-ms', type=float, default=1.0, help='ignore p50 slowdowns smaller than this')
+    args = parser.parse_args(argv)
+    year, month = args.end.split('-')
+    args.end = (int(year), int(month))
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    os.makedirs(args.data_dir, exist_ok=True)
+    
+    print(f"{'rows':>8} {'benchmark':<30} {'p50 ms':>9} {'p95 ms':>9} {'queries':>7} {'peak KiB':>10}")
+    results = {str(rows): run_size(args, rows) for rows in args.sizes}
+    
+    report = {
+        'meta': {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'schema_version': SCHEMA_VERSION,
+            'seed': args.seed,
+            'end': '%d-%02d' % args.end,
+            'repeat': args.repeat,
+            'cache': args.cache,
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f'\nResults written to {args.output}')
+    
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.threshold, args.min_delta_ms)
+        if regressions:
+            print(f'\n{len(regressions)} regression(s) against {args.baseline}:')
+            for line in regressions:
+                print('  ' + line)
+            sys.exit(1)
+        print(f'\nNo regressions against {args.baseline} (threshold {args.threshold:.0%}).')
+
+if __name__ == '__main__':
+    main()
@@ -22,6 +22,49 @@ class Config:
     # Disable SQLAlchemy track modifications (saves memory)
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Connection pool (file databases; in-memory SQLite uses a single connection)
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+    DB_POOL_TIMEOUT = 30  # seconds to wait for a free connection
+    DB_POOL_RECYCLE = 3600  # seconds before a connection is replaced
+    
+    # Applied to every new SQLite connection, in this order
+    SQLITE_PRAGMAS = {
+        'busy_timeout': 5000,  # ms to wait for a lock instead of failing
+        'journal_mode': 'WAL',  # readers no longer block on the writer
+        'synchronous': 'NORMAL',  # safe with WAL, one fsync per checkpoint
+        'cache_size': -32000,  # page cache per connection, in KiB when negative
+        'mmap_size': 256 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+        'auto_vacuum': 'INCREMENTAL',  # new databases only; see flask database maintain
+    }
+    
+    # Password hashing: werkzeug method string with its cost, e.g. 'pbkdf2:sha256:600000'
+    # or 'scrypt:32768:8:1'. Older hashes are upgraded on the next successful login.
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD') or 'pbkdf2:sha256:600000'
+    PASSWORD_SALT_LENGTH = 16
+    # Processes that hash/verify passwords (0 = inline), queued requests allowed, and wait limit
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_MAX_PENDING = 32
+    PASSWORD_HASH_TIMEOUT = 10  # seconds
+    
+    # Spend forecast: daily history loaded, days behind the weekday profile, days in the JSON series
+    FORECAST_HISTORY_DAYS = 730
+    FORECAST_PROFILE_DAYS = 90
+    FORECAST_SERIES_DAYS = 90
+    
+    # Anomaly detection: robust z-score threshold, minimum excess in rupees, months of
+    # history (and at most this many earlier expenses), months/expenses a baseline needs,
+    # days of expenses checked, results per list
+    ANOMALY_THRESHOLD = 3.5
+    ANOMALY_MIN_AMOUNT = 500
+    ANOMALY_HISTORY_MONTHS = 120
+    ANOMALY_BASELINE_EXPENSES = 20000
+    ANOMALY_MIN_HISTORY = 6
+    ANOMALY_MIN_EXPENSES = 8
+    ANOMALY_RECENT_DAYS = 30
+    ANOMALY_MAX_RESULTS = 5
+    
     # Session configuration
     PERMANENT_SESSION_LIFETIME = timedelta(hours=24)
     SESSION_COOKIE_SECURE = False  # Set True for HTTPS
@@ -30,21 +73,73 @@ class Config:
     
     # File upload settings (for reports)
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max
+    
+    # Dashboard result cache: 'memory' (per process), 'sqlite' (shared by workers) or 'null'
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND') or 'memory'
+    CACHE_DEFAULT_TTL = 300  # seconds
+    CACHE_MAX_ENTRIES = 1000
+    CACHE_SQLITE_PATH = os.environ.get('CACHE_SQLITE_PATH') or os.path.join(BASE_DIR, 'cache.db')
+    
+    # Session user rows and category lists, kept in the same backend (invalidated on change)
+    REFDATA_TTL = 600  # seconds
+    
+    # Reports: longest period accepted, and bytes kept in memory before spilling to a temp file
+    REPORT_MAX_MONTHS = 12
+    REPORT_SPOOL_MAX_SIZE = 1024 * 1024
+    
+    # Background report jobs: pool size and on-disk artifact cache limits
+    REPORT_JOB_WORKERS = 2
+    REPORT_JOB_TIMEOUT = 600  # seconds before a pending job is considered lost
+    REPORT_ARTIFACT_DIR = os.environ.get('REPORT_ARTIFACT_DIR') or os.path.join(BASE_DIR, 'report_cache')
+    REPORT_ARTIFACT_MAX_AGE = 24 * 3600  # seconds
+    REPORT_ARTIFACT_MAX_BYTES = 200 * 1024 * 1024
+    
+    # Show record totals on list pages (counted once per data version, then cached)
+    LIST_SHOW_TOTALS = True
+    
+    # Largest number of operations accepted by one /api batch request
+    API_BATCH_MAX_OPERATIONS = 1000
+    
+    # Expenses moved per transaction when categories are merged or reassigned
+    CATEGORY_MOVE_BATCH_SIZE = 2000
+    
+    # Recurring rules and generated rows per materialization transaction;
+    # LAZY also runs a user's due rules when they open the dashboard or their
+    # expense/income lists
+    RECURRING_BATCH_SIZE = 500
+    RECURRING_MAX_ROWS = 2000
+    RECURRING_LAZY = True
+    # Oldest start date accepted for a new rule, in days before today
+    RECURRING_MAX_BACKFILL_DAYS = 3660
+    
+    # Most results returned by /api/expenses/search
+    API_SEARCH_MAX_RESULTS = 100
+    
+    # SQL instrumentation: Server-Timing headers, slow statement and N+1 logging
+    SQL_INSTRUMENTATION = os.environ.get('SQL_INSTRUMENTATION', '').lower() in ('1', 'true', 'yes')
+    SQL_SLOW_QUERY_MS = 100
+    SQL_N_PLUS_ONE_THRESHOLD = 5  # identical statements per request before warning
 
 class DevelopmentConfig(Config):
     """Development environment configuration."""
     DEBUG = True
     TESTING = False
+    # The reloader and a single user do not need a hashing pool
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 0))
 
 class ProductionConfig(Config):
     """Production environment configuration."""
     DEBUG = False
     TESTING = False
+    # Gunicorn workers share one on-disk cache
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND') or 'sqlite'
+    CACHE_MAX_ENTRIES = 10000
 
 class TestingConfig(Config):
     """Testing environment configuration."""
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    PASSWORD_HASH_WORKERS = 0
 
 # Config dictionary for easy switching
 config = {
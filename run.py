@@ -4,10 +4,10 @@ Usage: python run.py
 """
 
 import os
-from app import create_app
+from app import get_app
 
 # Create application instance
-app = create_app(os.getenv('FLASK_ENV', 'development'))
+app = get_app(os.getenv('FLASK_ENV', 'development'))
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
@@ -1,105 +1,219 @@
 """
 Sample data seeding script for Expense Tracker.
-Creates a demo user with categories, expenses, income, and budget.
+Creates a demo user with categories, expenses, income, and budget, or a
+larger synthetic dataset for capacity planning and benchmarks.
 Run: python -m scripts.seed_data (from project root)
+     python -m scripts.seed_data --users 1000 --months 24 --expenses-per-month 400 --seed 7
+
+Data is drawn from a seeded random generator, so the same arguments (with
+--end fixed) always produce the same dataset. Users, categories, expenses
+and income are written with bulk Core inserts, one transaction per batch.
 """
 
+import argparse
+import calendar
 import sys
 import os
-from datetime import datetime, timedelta
-from random import choice, randint, uniform
+import time
+from datetime import date, datetime
+from random import Random
 
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from sqlalchemy import select
+from werkzeug.security import generate_password_hash
 from app import create_app, db
 from app.models.user import User
 from app.models.category import Category
 from app.models.expense import Expense
 from app.models.income import Income
 from app.models.budget import Budget
+from app.services.rollups import rebuild_rollups
+from app.utils.dates import parse_year_month
 
-def seed_data():
-    app = create_app()
-    with app.app_context():
-        # Check if demo user exists
-        if User.query.filter_by(email='demo@expensetracker.com').first():
-            print("Demo user already exists. Skipping seed.")
-            return
+DEMO_EMAIL = 'demo@expensetracker.com'
+DEMO_PASSWORD = 'demo123'
 
-        # Create demo user
-        user = User(name='Demo User', email='demo@expensetracker.com')
-        user.set_password('demo123')
-        db.session.add(user)
-        db.session.commit()
-        print("Created demo user: demo@expensetracker.com / demo123")
-
-        # Create categories
-        category_names = ['Food', 'Transport', 'Rent', 'Utilities', 'Entertainment', 'Shopping', 'Healthcare']
-        categories = []
-        for name in category_names:
-            cat = Category(user_id=user.user_id, category_name=name)
-            db.session.add(cat)
-            categories.append(cat)
+# (name, median amount, descriptions) - earlier categories are used more often
+CATEGORY_PROFILES = [
+    ('Food', 350, ['Monthly groceries', 'Lunch', 'Dinner out', 'Coffee', 'Snacks']),
+    ('Transport', 200, ['Fuel', 'Taxi', 'Bus pass', 'Parking']),
+    ('Shopping', 600, ['Clothes', 'Electronics', 'Household items', 'Gifts']),
+    ('Utilities', 700, ['Electricity bill', 'Water bill', 'Internet', 'Phone recharge']),
+    ('Entertainment', 250, ['Movie', 'Concert', 'Streaming subscription', 'Games']),
+    ('Healthcare', 400, ['Medicine', 'Doctor visit', 'Lab tests']),
+    ('Rent', 9000, ['Monthly rent']),
+    ('Education', 1500, ['Books', 'Course fee', 'Stationery']),
+    ('Travel', 3000, ['Flight', 'Hotel', 'Train tickets']),
+    ('Personal Care', 300, ['Haircut', 'Toiletries', 'Gym membership']),
+    ('Insurance', 2500, ['Health insurance', 'Vehicle insurance']),
+    ('Pets', 500, ['Pet food', 'Vet visit']),
+]
+
+def build_categories(count):
+    """Category profiles for a user, padded with generic ones past the built-in list."""
+    profiles = CATEGORY_PROFILES[:count]
+    for i in range(len(profiles), count):
+        profiles.append((f'Category {i + 1}', 300, ['Misc expense']))
+    return profiles
+
+def month_sequence(end, months):
+    """The (year, month) pairs of the last `months` months up to end, oldest first."""
+    year, month = end
+    pairs = []
+    for _ in range(months):
+        pairs.append((year, month))
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+    return pairs[::-1]
+
+class Seeder:
+    """Generates skewed synthetic data and writes it in bulk batches."""
+
+    def __init__(self, args):
+        self.args = args
+        self.rng = Random(args.seed)
+        self.profiles = build_categories(args.categories)
+        # Zipf-like category popularity: a few categories get most expenses
+        weights = [1 / (rank + 1) ** 1.1 for rank in range(len(self.profiles))]
+        self.cum_weights = [sum(weights[:i + 1]) for i in range(len(weights))]
+        self.periods = month_sequence(args.end, args.months)
+        self.today = date.today()
+        self.expense_rows = []
+        self.income_rows = []
+        self.written = {'expenses': 0, 'income': 0}
+
+    def create_users(self):
+        """Insert all users with one shared password hash; returns their ids in order."""
+        password_hash = generate_password_hash(DEMO_PASSWORD, method='pbkdf2:sha256')
+        emails = [DEMO_EMAIL] + [f'user{i}@example.com' for i in range(1, self.args.users)]
+        now = datetime.utcnow()
+        db.session.execute(User.__table__.insert(), [
+            {'name': 'Demo User' if i == 0 else f'User {i}', 'email': email,
+             'password_hash': password_hash, 'created_at': now}
+            for i, email in enumerate(emails)
+        ])
+        ids = dict(db.session.execute(select(User.email, User.user_id).where(User.email.in_(emails))).all())
         db.session.commit()
-        print(f"Created {len(categories)} categories")
-
-        # Create expenses for last 3 months
-        now = datetime.now()
-        expense_amounts = [
-            (250, 800), (100, 500), (500, 2000), (200, 1500), (50, 300), (100, 1000), (50, 400)
-        ]
-        descriptions = ['Monthly groceries', 'Fuel', ' rent', 'Electricity bill', 'Movie', 'Clothes', 'Medicine']
-
-        for month_offset in range(3):
-            base_date = now - timedelta(days=30 * month_offset)
-            year, month = base_date.year, base_date.month
-            for _ in range(randint(8, 15)):
-                cat_idx = randint(0, len(categories) - 1)
-                lo, hi = expense_amounts[cat_idx]
-                amount = round(uniform(lo, hi), 2)
-                day = randint(1, 28)  # Use 1-28 to avoid month boundary issues
-                try:
-                    expense_date = datetime(year, month, day).date()
-                except ValueError:
-                    expense_date = datetime(year, month, 28).date()
-                exp = Expense(
-                    user_id=user.user_id,
-                    category_id=categories[cat_idx].category_id,
-                    amount=amount,
-                    expense_date=expense_date,
-                    description=choice(descriptions)
-                )
-                db.session.add(exp)
+        return [ids[email] for email in emails]
+
+    def create_categories(self, user_ids):
+        """Insert every user's categories; returns {user_id: [category_id in profile order]}."""
+        names = [name for name, _, _ in self.profiles]
+        rows = [{'user_id': uid, 'category_name': name} for uid in user_ids for name in names]
+        for start in range(0, len(rows), self.args.batch_size):
+            db.session.execute(Category.__table__.insert(), rows[start:start + self.args.batch_size])
+
+        order = {name: i for i, name in enumerate(names)}
+        categories = {uid: [None] * len(names) for uid in user_ids}
+        for start in range(0, len(user_ids), 500):
+            batch = user_ids[start:start + 500]
+            for category_id, uid, name in db.session.execute(select(
+                Category.category_id, Category.user_id, Category.category_name
+            ).where(Category.user_id.in_(batch))):
+                categories[uid][order[name]] = category_id
         db.session.commit()
-        print("Created sample expenses")
-
-        # Create income
-        for month_offset in range(3):
-            base_date = now - timedelta(days=30 * month_offset)
-            income_date = datetime(base_date.year, base_date.month, 1).date()
-            inc = Income(
-                user_id=user.user_id,
-                amount=round(uniform(25000, 45000), 2),
-                income_date=income_date,
-                source='Salary'
-            )
-            db.session.add(inc)
+        return categories
+
+    def generate_user(self, user_id, category_ids):
+        """Queue one user's expenses and income, flushing full batches as they fill."""
+        rng = self.rng
+        # Heavy-tailed activity and income: most users are light, a few are very active
+        activity = rng.lognormvariate(0, 0.6)
+        salary = round(rng.lognormvariate(10.4, 0.35) * 100)  # paise
+        indexes = range(len(category_ids))
+
+        for year, month in self.periods:
+            last_day = calendar.monthrange(year, month)[1]
+            if (year, month) == (self.today.year, self.today.month):
+                last_day = self.today.day
+            count = max(0, round(self.args.expenses_per_month * activity * rng.uniform(0.8, 1.2)))
+            for index in rng.choices(indexes, cum_weights=self.cum_weights, k=count):
+                _, median, descriptions = self.profiles[index]
+                self.expense_rows.append({
+                    'user_id': user_id,
+                    'category_id': category_ids[index],
+                    'amount_minor': round(median * rng.lognormvariate(0, 0.7) * 100) or 1,
+                    'expense_date': date(year, month, 1 + int(rng.random() * last_day)),
+                    'description': descriptions[int(rng.random() * len(descriptions))]
+                })
+
+            self.income_rows.append({
+                'user_id': user_id, 'amount_minor': salary,
+                'income_date': date(year, month, 1), 'source': 'Salary'
+            })
+            if rng.random() < 0.2:
+                self.income_rows.append({
+                    'user_id': user_id, 'amount_minor': round(salary * rng.uniform(0.05, 0.4)),
+                    'income_date': date(year, month, 1 + int(rng.random() * last_day)), 'source': 'Freelance'
+                })
+
+            if len(self.expense_rows) >= self.args.batch_size:
+                self.flush()
+
+    def flush(self):
+        """Write the queued rows with one executemany per table and commit."""
+        if self.expense_rows:
+            db.session.execute(Expense.__table__.insert(), self.expense_rows)
+        if self.income_rows:
+            db.session.execute(Income.__table__.insert(), self.income_rows)
         db.session.commit()
-        print("Created sample income")
-
-        # Create budget for current month
-        budget = Budget(
-            user_id=user.user_id,
-            month=now.month,
-            year=now.year,
-            amount=35000
-        )
-        db.session.add(budget)
+        self.written['expenses'] += len(self.expense_rows)
+        self.written['income'] += len(self.income_rows)
+        self.expense_rows, self.income_rows = [], []
+
+    def create_budgets(self, user_ids):
+        """A budget for the last seeded month, for every user."""
+        year, month = self.periods[-1]
+        db.session.execute(Budget.__table__.insert(), [
+            {'user_id': uid, 'month': month, 'year': year,
+             'amount_minor': int(round(self.rng.lognormvariate(10.3, 0.3), -2)) * 100}
+            for uid in user_ids
+        ])
         db.session.commit()
-        print("Created sample budget")
 
-        print("\nSeed completed! Login with: demo@expensetracker.com / demo123")
+    def run(self):
+        started = time.perf_counter()
+        user_ids = self.create_users()
+        print(f"Created {len(user_ids)} users (password: {DEMO_PASSWORD})")
+        categories = self.create_categories(user_ids)
+        print(f"Created {len(self.profiles)} categories per user")
+
+        for uid in user_ids:
+            self.generate_user(uid, categories[uid])
+        self.flush()
+        print(f"Created {self.written['expenses']} expenses and {self.written['income']} income entries")
+
+        self.create_budgets(user_ids)
+        rebuild_rollups(user_ids)
+        print(f"Built budgets and monthly rollups in {time.perf_counter() - started:.1f}s total")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Seed the database with demo or synthetic data.')
+    parser.add_argument('--users', type=int, default=1, help='number of users (the first is the demo user)')
+    parser.add_argument('--months', type=int, default=3, help='months of history per user')
+    parser.add_argument('--expenses-per-month', type=int, default=12, help='average expenses per user per month')
+    parser.add_argument('--categories', type=int, default=7, help='categories per user')
+    parser.add_argument('--seed', type=int, default=42, help='random seed, for reproducible datasets')
+    parser.add_argument('--end', type=parse_year_month, default=(date.today().year, date.today().month),
+                        help='last month of history as YYYY-MM (default: current month)')
+    parser.add_argument('--batch-size', type=int, default=20000, help='rows per insert transaction')
+    args = parser.parse_args(argv)
+    if args.users < 1 or args.months < 1 or args.categories < 1 or args.expenses_per_month < 0:
+        parser.error('users, months and categories must be at least 1')
+    return args
+
+def seed_data(argv=None):
+    args = parse_args(argv)
+    app = create_app()
+    with app.app_context():
+        # Check if demo user exists
+        if User.query.filter_by(email=DEMO_EMAIL).first():
+            print("Demo user already exists. Skipping seed.")
+            return
+
+        Seeder(args).run()
+        print(f"\nSeed completed! Login with: {DEMO_EMAIL} / {DEMO_PASSWORD}")
 
 if __name__ == '__main__':
     seed_data()
@@ -1,9 +1,9 @@
 """
 WSGI entry point for production servers (Gunicorn, etc.)
-Usage: gunicorn wsgi:app
+Usage: gunicorn wsgi:app (add --preload to build the app once in the master)
 """
 
 import os
-from app import create_app
+from app import get_app
 
-app = create_app(os.getenv('FLASK_ENV', 'production'))
+app = get_app(os.getenv('FLASK_ENV', 'production'))